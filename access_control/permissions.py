@@ -0,0 +1,111 @@
+from functools import wraps
+import click
+from flask import redirect, url_for, flash
+from flask_login import current_user
+from access_control.roles import Role
+
+# Every permission gets one bit, assigned once at import
+PERMISSIONS = [
+    'tax_audit.view',
+    'tax_audit.submit',
+    'transfer_pricing.view',
+    'transfer_pricing.submit',
+    'risk.view',
+    'risk.submit',
+    'company_profile.view',
+    'profiler.view',
+    'backup.manage'
+]
+
+PERMISSION_BITS = {name: 1 << index for index, name in enumerate(PERMISSIONS)}
+ALL_PERMISSIONS = (1 << len(PERMISSIONS)) - 1
+
+# Permissions granted to each role. Submitting stays with the specialist roles,
+# as the original has_role checks allowed, so admins view but do not submit.
+ROLE_GRANTS = {
+    Role.ADMIN: [name for name in PERMISSIONS if not name.endswith('.submit')],
+    Role.SUPERVISOR: ['company_profile.view'],
+    Role.AUDITOR: [],
+    Role.TAX_AUDITOR: ['tax_audit.view', 'tax_audit.submit'],
+    Role.TRANSFER_PRICING_SPECIALIST: ['transfer_pricing.view', 'transfer_pricing.submit'],
+    Role.RISK_ANALYST: ['risk.view', 'risk.submit'],
+    Role.USER: []
+}
+
+def _compile_mask(permissions):
+    mask = 0
+    for name in permissions:
+        mask |= PERMISSION_BITS[name]
+    return mask
+
+# Role name -> permission bitmask, keyed by the stored role string
+ROLE_MASKS = {role.value: _compile_mask(grants) for role, grants in ROLE_GRANTS.items()}
+
+# Endpoint -> required permission bit, filled by init_app once routes are registered
+ENDPOINT_MASKS = {}
+
+def mask_for_role(role_name):
+    """Resolve a stored role string (any case) to its permission bitmask"""
+    return ROLE_MASKS.get(str(role_name or '').strip().lower(), 0)
+
+def attach_permissions(user):
+    """Store the resolved permission bitmask on a loaded user"""
+    if user is not None:
+        user.permissions = mask_for_role(user.role)
+    return user
+
+def permission_mask(user):
+    mask = getattr(user, 'permissions', None)
+    if mask is None:
+        mask = mask_for_role(getattr(user, 'role', None))
+    return mask
+
+def has_permission(user, permission):
+    return bool(permission_mask(user) & PERMISSION_BITS[permission])
+
+def permission_required(permission, deny_endpoint='auth.login'):
+    bit = PERMISSION_BITS[permission]
+
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if not current_user.is_authenticated:
+                flash("Please log in to access this page.", "warning")
+                return redirect(url_for("auth.login"))
+
+            if not permission_mask(current_user) & bit:
+                flash("Access denied: insufficient permissions.", "danger")
+                return redirect(url_for(deny_endpoint))
+
+            return f(*args, **kwargs)
+        decorated_function.required_permission = permission
+        return decorated_function
+    return decorator
+
+def roles_with(permission):
+    bit = PERMISSION_BITS[permission]
+    return sorted(role for role, mask in ROLE_MASKS.items() if mask & bit)
+
+def access_matrix():
+    """Map each protected endpoint to the roles that can reach it"""
+    return {
+        endpoint: roles_with(permission)
+        for endpoint, (permission, _) in sorted(ENDPOINT_MASKS.items())
+    }
+
+def init_app(app):
+    """Compile the endpoint table from the registered view functions"""
+    ENDPOINT_MASKS.clear()
+    for endpoint, view in app.view_functions.items():
+        permission = getattr(view, 'required_permission', None)
+        if permission:
+            ENDPOINT_MASKS[endpoint] = (permission, PERMISSION_BITS[permission])
+
+    @app.cli.command('permissions')
+    @click.option('--endpoint', default=None, help='Only show this endpoint.')
+    def permissions_command(endpoint):
+        """List which roles can reach each protected endpoint"""
+        for name, roles in access_matrix().items():
+            if endpoint and name != endpoint:
+                continue
+            click.echo(f"{name}: {', '.join(roles) or '-'}")
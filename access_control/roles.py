@@ -7,6 +7,9 @@ class Role(Enum):
     ADMIN = 'admin'
     SUPERVISOR = 'supervisor'
     AUDITOR = 'auditor'
+    TAX_AUDITOR = 'tax_auditor'
+    TRANSFER_PRICING_SPECIALIST = 'transfer_pricing_specialist'
+    RISK_ANALYST = 'risk_analyst'
     USER = 'user'
 
 # Define role hierarchy
@@ -14,10 +17,18 @@ ROLE_HIERARCHY = {
     Role.ADMIN: 4,
     Role.SUPERVISOR: 3,
     Role.AUDITOR: 2,
+    Role.TAX_AUDITOR: 2,
+    Role.TRANSFER_PRICING_SPECIALIST: 2,
+    Role.RISK_ANALYST: 2,
     Role.USER: 1
 }
 
+# Stored role string -> hierarchy level, built once at import
+ROLE_LEVELS = {role.value: level for role, level in ROLE_HIERARCHY.items()}
+
 def role_required(required_role):
+    required_level = ROLE_HIERARCHY.get(required_role, 0)
+
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
@@ -25,13 +36,12 @@ def role_required(required_role):
                 flash("Please log in to access this page.", "warning")
                 return redirect(url_for("auth.login"))
 
-            try:
-                user_role = Role(current_user.role)
-            except ValueError:
+            user_level = ROLE_LEVELS.get(str(current_user.role or '').strip().lower())
+            if user_level is None:
                 flash("Invalid user role.", "danger")
                 return redirect(url_for("auth.login"))
 
-            if ROLE_HIERARCHY.get(user_role, 0) < ROLE_HIERARCHY.get(required_role, 0):
+            if user_level < required_level:
                 flash("You do not have permission to access this page.", "danger")
                 return redirect(url_for("auth.login"))
 
@@ -6,15 +6,20 @@ import logging
 import sqlite3
 from datetime import datetime
 from flask import Flask, render_template, request, redirect, url_for, flash, send_file, jsonify
-from flask_sqlalchemy import SQLAlchemy
-from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
+from flask_login import LoginManager, login_user, login_required, logout_user, current_user
 from flask_wtf import FlaskForm
 from werkzeug.security import generate_password_hash, check_password_hash
 from functools import wraps
+from werkzeug.middleware.proxy_fix import ProxyFix
 from logging.handlers import RotatingFileHandler
+from modules.models import db, User
+from access_control.permissions import attach_permissions, init_app as init_permissions
+from modules.gst_archive import (
+    init_app as init_gst_archive, parse_date_range, iter_calculations, gst_rollup
+)
+from modules.streaming import stream_page, init_app as init_streaming
 
 # Initialize extensions
-db = SQLAlchemy()
 login_manager = LoginManager()
 
 # VAT rates by country (keeping existing for backward compatibility)
@@ -59,17 +64,6 @@ GST_ZERO_RATED_ITEMS = [
 ]
 
 # Models
-class Compliance(db.Model):
-    __tablename__ = 'compliance'
-    id = db.Column(db.Integer, primary_key=True)
-    company = db.Column(db.String(100), nullable=False)
-    regulation = db.Column(db.String(100), nullable=False)
-    status = db.Column(db.String(50), nullable=False)
-    findings = db.Column(db.Text)
-    recommendations = db.Column(db.Text)
-    checked_by = db.Column(db.String(100))
-    next_review_date = db.Column(db.String(10))
-
 class GSTCalculation(db.Model):
     __tablename__ = 'gst_calculations'
     id = db.Column(db.Integer, primary_key=True)
@@ -81,19 +75,13 @@ class GSTCalculation(db.Model):
     gst_amount = db.Column(db.Float, nullable=False)
     net_amount = db.Column(db.Float, nullable=False)
     total_amount = db.Column(db.Float, nullable=False)
-    calculation_date = db.Column(db.DateTime, default=datetime.utcnow)
+    calculation_date = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     calculated_by = db.Column(db.String(100))
     notes = db.Column(db.Text)
 
-class User(UserMixin, db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    email = db.Column(db.String(150), unique=True, nullable=False)
-    password = db.Column(db.String(150), nullable=False)
-    role = db.Column(db.String(20), nullable=False, default='user')
-
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    return attach_permissions(User.query.get(int(user_id)))
 
 # GST Calculation Functions
 def calculate_gst_inclusive(gross_amount, gst_rate):
@@ -141,6 +129,13 @@ def create_app():
     db_path = os.environ.get('DATABASE_PATH', '/tmp/lra_app.db')
     os.makedirs(os.path.dirname(db_path), exist_ok=True)
 
+    app.config['DATABASE_PATH'] = db_path
+
+    # Behind a reverse proxy (Render, nginx) take the client IP from X-Forwarded-For
+    app.config['TRUSTED_PROXY_COUNT'] = int(os.environ.get('TRUSTED_PROXY_COUNT', 0))
+    if app.config['TRUSTED_PROXY_COUNT']:
+        count = app.config['TRUSTED_PROXY_COUNT']
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=count, x_proto=count, x_host=count)
     app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
@@ -148,6 +143,8 @@ def create_app():
     db.init_app(app)
     login_manager.init_app(app)
     login_manager.login_view = 'auth.login'
+    from auth.login_security import login_guard
+    login_guard.init_app(app)
 
     # Logging setup
     file_handler = RotatingFileHandler('logs/lra_app.log', maxBytes=10240, backupCount=10)
@@ -162,6 +159,14 @@ def create_app():
     # Create tables
     with app.app_context():
         db.create_all()
+        from modules.review_scheduler import migrate_next_review_date
+        migrate_next_review_date(db.engine)
+        from modules.api import migrate_compliance_change_tracking
+        migrate_compliance_change_tracking(db.engine)
+        from modules.company_profile import backfill_profiles
+        backfill_profiles()
+    init_gst_archive(app)
+    init_streaming(app)
 
     # Register blueprints (keeping existing ones)
     from auth.routes import auth as auth_blueprint
@@ -169,12 +174,27 @@ def create_app():
     from modules.transfer_pricing import tp_bp
     from modules.compliance import compliance_bp
     from modules.risk import risk_bp
+    from modules.international_tax import intl_tax_bp
+    from modules.company_profile import profile_bp
+    from modules.profiler import profiler_bp, init_app as init_profiler
+    from modules.backup import backup_bp, init_app as init_backup
+    from modules.api import api_bp, API_VERSION
 
     app.register_blueprint(auth_blueprint, url_prefix='/auth')
     app.register_blueprint(tax_audit_bp, url_prefix='/tax_audit')
     app.register_blueprint(tp_bp, url_prefix='/transfer_pricing')
     app.register_blueprint(compliance_bp, url_prefix='/compliance')
     app.register_blueprint(risk_bp, url_prefix='/risk')
+    app.register_blueprint(intl_tax_bp, url_prefix='/international_tax')
+    app.register_blueprint(profile_bp, url_prefix='/company_profiles')
+    app.register_blueprint(profiler_bp, url_prefix='/admin/profiler')
+    init_profiler(app)
+    app.register_blueprint(backup_bp, url_prefix='/admin/backups')
+    init_backup(app)
+    app.register_blueprint(api_bp, url_prefix=f'/api/{API_VERSION}')
+
+    # Compile endpoint permission masks once every blueprint is registered
+    init_permissions(app)
 
     @app.route('/admin_dashboard')
     @login_required
@@ -245,8 +265,25 @@ def create_app():
     @app.route('/gst_history')
     @login_required
     def gst_history():
-        calculations = GSTCalculation.query.order_by(GSTCalculation.calculation_date.desc()).all()
-        return render_template('gst/gst_history.html', calculations=calculations)
+        # Without a date range only the hot table is read; archives are opened on demand
+        try:
+            start, end = parse_date_range(request.args.get('start'), request.args.get('end'))
+        except ValueError:
+            flash('Dates must be in YYYY-MM-DD format.', 'error')
+            start, end = None, None
+        calculations = iter_calculations(start, end, include_archives=start is not None or end is not None)
+        next(calculations)
+        return stream_page('gst/gst_history.html', calculations=calculations, start=start, end=end)
+
+    @app.route('/api/gst_rollup')
+    @login_required
+    def api_gst_rollup():
+        """Monthly GST totals per resource type, including archived years in range"""
+        try:
+            start, end = parse_date_range(request.args.get('start'), request.args.get('end'))
+        except ValueError:
+            return jsonify({'success': False, 'error': 'Dates must be in YYYY-MM-DD format'}), 400
+        return jsonify({'success': True, 'rollup': gst_rollup(start, end)})
 
     @app.route('/api/gst_rates')
     def api_gst_rates():
@@ -322,18 +359,19 @@ def create_app():
     @app.route('/export_gst_calculations_csv')
     @login_required
     def export_gst_calculations_csv():
-        """Export GST calculations to CSV"""
+        """Export GST calculations to CSV, optionally limited to ?start=&end="""
+        try:
+            start, end = parse_date_range(request.args.get('start'), request.args.get('end'))
+        except ValueError:
+            flash('Dates must be in YYYY-MM-DD format.', 'error')
+            return redirect(url_for('gst_history'))
         filepath = os.path.join('exports', f'gst_calculations_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv')
-        with sqlite3.connect('instance/lra_app.db') as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM gst_calculations")
-            rows = cursor.fetchall()
-            headers = [description[0] for description in cursor.description]
-            with open(filepath, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow(headers)
-                writer.writerows(rows)
-        return send_file(filepath, as_attachment=True)
+        rows = iter_calculations(start, end, newest_first=False)
+        with open(filepath, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(next(rows))
+            writer.writerows(rows)
+        return send_file(os.path.abspath(filepath), as_attachment=True)
 
     return app
 
@@ -0,0 +1,137 @@
+import os
+import threading
+import time
+from collections import deque
+from werkzeug.security import generate_password_hash, check_password_hash
+
+# Hash method for new and rehashed passwords, in Werkzeug's method syntax.
+# None keeps Werkzeug's own default, which existing hashes already use, and
+# disables rehashing; set PASSWORD_HASH_METHOD to migrate hashes on login.
+DEFAULT_PASSWORD_HASH_METHOD = None
+
+# Login attempts per email, and failed logins per client IP, allowed per
+# window before requests are rejected unhashed
+DEFAULT_LOGIN_ATTEMPTS_PER_EMAIL = 5
+DEFAULT_LOGIN_FAILURES_PER_IP = 30
+DEFAULT_LOGIN_WINDOW_SECONDS = 60
+
+def canonical_method(method):
+    """Return the method prefix Werkzeug writes for a configured method.
+
+    Werkzeug fills in defaults ('pbkdf2' becomes 'pbkdf2:sha256:<iterations>'),
+    so the prefix is taken from a real hash rather than the config string.
+    """
+    return generate_password_hash('', method=method).split('$', 1)[0]
+
+def needs_rehash(stored_hash, method_prefix):
+    return stored_hash.split('$', 1)[0] != method_prefix
+
+class SlidingWindowLimiter:
+    """Counts events per key over a sliding time window, in process memory"""
+
+    def __init__(self, limit, window_seconds, max_keys=100000):
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self.max_keys = max_keys
+        self._events = {}
+        self._lock = threading.Lock()
+
+    def _trim(self, events, now):
+        cutoff = now - self.window_seconds
+        while events and events[0] <= cutoff:
+            events.popleft()
+
+    def _prune(self, now):
+        for key in list(self._events):
+            self._trim(self._events[key], now)
+            if not self._events[key]:
+                del self._events[key]
+
+    def blocked(self, key):
+        """Return True if the key is at its limit, without recording anything"""
+        now = time.monotonic()
+        with self._lock:
+            events = self._events.get(key)
+            if not events:
+                return False
+            self._trim(events, now)
+            return len(events) >= self.limit
+
+    def hit(self, key):
+        """Record an attempt; return False if the key is over its limit"""
+        now = time.monotonic()
+        with self._lock:
+            events = self._events.get(key)
+            if events is None:
+                if len(self._events) >= self.max_keys:
+                    self._prune(now)
+                events = self._events[key] = deque()
+            self._trim(events, now)
+            if len(events) >= self.limit:
+                return False
+            events.append(now)
+            return True
+
+    def reset(self, key):
+        with self._lock:
+            self._events.pop(key, None)
+
+class LoginGuard:
+    """Throttles login attempts per email and failed logins per client IP, and verifies passwords.
+
+    Only failures count against the IP window, so many officers logging in
+    from one office address at shift start are not throttled. Rejections
+    happen before any password hashing. When PASSWORD_HASH_METHOD is set,
+    passwords stored with other parameters are rehashed on success.
+    """
+
+    def __init__(self):
+        self.method = DEFAULT_PASSWORD_HASH_METHOD
+        self.method_prefix = None
+        self.by_email = SlidingWindowLimiter(DEFAULT_LOGIN_ATTEMPTS_PER_EMAIL, DEFAULT_LOGIN_WINDOW_SECONDS)
+        self.by_ip = SlidingWindowLimiter(DEFAULT_LOGIN_FAILURES_PER_IP, DEFAULT_LOGIN_WINDOW_SECONDS)
+
+    def init_app(self, app):
+        app.config.setdefault('PASSWORD_HASH_METHOD',
+                              os.environ.get('PASSWORD_HASH_METHOD') or DEFAULT_PASSWORD_HASH_METHOD)
+        app.config.setdefault('LOGIN_ATTEMPTS_PER_EMAIL',
+                              int(os.environ.get('LOGIN_ATTEMPTS_PER_EMAIL', DEFAULT_LOGIN_ATTEMPTS_PER_EMAIL)))
+        app.config.setdefault('LOGIN_FAILURES_PER_IP',
+                              int(os.environ.get('LOGIN_FAILURES_PER_IP', DEFAULT_LOGIN_FAILURES_PER_IP)))
+        app.config.setdefault('LOGIN_WINDOW_SECONDS',
+                              int(os.environ.get('LOGIN_WINDOW_SECONDS', DEFAULT_LOGIN_WINDOW_SECONDS)))
+
+        self.method = app.config['PASSWORD_HASH_METHOD']
+        self.method_prefix = canonical_method(self.method) if self.method else None
+        window = app.config['LOGIN_WINDOW_SECONDS']
+        self.by_email = SlidingWindowLimiter(app.config['LOGIN_ATTEMPTS_PER_EMAIL'], window)
+        self.by_ip = SlidingWindowLimiter(app.config['LOGIN_FAILURES_PER_IP'], window)
+        app.extensions['login_guard'] = self
+
+    def allow(self, email, ip):
+        # Check the IP first so a flood across many emails is cut off cheaply
+        return not self.by_ip.blocked(ip) and self.by_email.hit((email or '').strip().lower())
+
+    def failed(self, ip):
+        self.by_ip.hit(ip)
+
+    def succeeded(self, email):
+        self.by_email.reset((email or '').strip().lower())
+
+    def hash_password(self, password):
+        if self.method:
+            return generate_password_hash(password, method=self.method)
+        return generate_password_hash(password)
+
+    def verify(self, user, password):
+        """Check a password and upgrade the stored hash if its parameters are stale.
+
+        Returns True when the password matches; the caller commits the session.
+        """
+        if not check_password_hash(user.password, password):
+            return False
+        if self.method_prefix and needs_rehash(user.password, self.method_prefix):
+            user.password = self.hash_password(password)
+        return True
+
+login_guard = LoginGuard()
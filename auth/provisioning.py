@@ -0,0 +1,109 @@
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+from werkzeug.security import generate_password_hash
+from access_control.roles import Role
+from modules.models import User, db
+
+# Users written per transaction
+PROVISION_BATCH_SIZE = 200
+
+VALID_ROLES = {role.value for role in Role}
+
+# DictReader key for values beyond the header columns
+EXTRA_VALUES_KEY = '_extra'
+
+def _hash_password(item):
+    password, method = item
+    if method:
+        return generate_password_hash(password, method=method)
+    return generate_password_hash(password)
+
+def read_users_csv(path):
+    """Read and validate email,role,password rows.
+
+    Returns (rows, errors); row numbers match the file, header is line 1.
+    """
+    rows = []
+    errors = []
+    seen = set()
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.DictReader(f, restkey=EXTRA_VALUES_KEY)
+        fields = {name.strip().lower() for name in (reader.fieldnames or [])}
+        missing = {'email', 'role', 'password'} - fields
+        if missing:
+            raise ValueError(f"CSV is missing columns: {', '.join(sorted(missing))}")
+        for line_number, raw in enumerate(reader, start=2):
+            extra = raw.pop(EXTRA_VALUES_KEY, None)
+            row = {(k or '').strip().lower(): (v or '').strip() for k, v in raw.items()}
+            email = row['email'].lower()
+            role = row['role'].lower()
+            if extra:
+                errors.append({'row': line_number, 'email': email, 'error': 'more values than columns'})
+            elif not email or '@' not in email:
+                errors.append({'row': line_number, 'email': email, 'error': 'invalid email'})
+            elif role not in VALID_ROLES:
+                errors.append({'row': line_number, 'email': email, 'error': f'unknown role {row["role"]!r}'})
+            elif not row['password']:
+                errors.append({'row': line_number, 'email': email, 'error': 'password is required'})
+            elif email in seen:
+                errors.append({'row': line_number, 'email': email, 'error': 'duplicate email in file'})
+            else:
+                seen.add(email)
+                rows.append({'row': line_number, 'email': email, 'role': role, 'password': row['password']})
+    return rows, errors
+
+def provision_users(rows, method, update_existing=False, workers=None, batch_size=PROVISION_BATCH_SIZE):
+    """Hash passwords in a process pool and upsert users in batched transactions.
+
+    Existing users are skipped unless update_existing is set, in which case
+    their role and password are replaced. Passwords are only hashed for rows
+    that will be written.
+    """
+    existing = {
+        email: user_id for user_id, email in db.session.query(User.id, User.email).filter(
+            User.email.in_([row['email'] for row in rows])
+        )
+    } if rows else {}
+
+    report = {'created': [], 'updated': [], 'skipped': []}
+    pending = []
+    for row in rows:
+        if row['email'] in existing and not update_existing:
+            report['skipped'].append(row['email'])
+        else:
+            pending.append(row)
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            chunksize = max(1, len(pending) // ((workers or os.cpu_count() or 1) * 4))
+            hashes = pool.map(_hash_password, ((row['password'], method) for row in pending), chunksize=chunksize)
+            for start in range(0, len(pending), batch_size):
+                batch = pending[start:start + batch_size]
+                inserts = []
+                for row in batch:
+                    stored = next(hashes)
+                    if row['email'] in existing:
+                        db.session.execute(
+                            User.__table__.update()
+                            .where(User.id == existing[row['email']])
+                            .values(role=row['role'], password=stored)
+                        )
+                        report['updated'].append(row['email'])
+                    else:
+                        inserts.append({'email': row['email'], 'role': row['role'], 'password': stored})
+                        report['created'].append(row['email'])
+                if inserts:
+                    db.session.execute(User.__table__.insert(), inserts)
+                db.session.commit()
+    return report
+
+def write_report(path, report, errors):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['email', 'result', 'detail'])
+        for result in ('created', 'updated', 'skipped'):
+            for email in report[result]:
+                writer.writerow([email, result, 'already exists' if result == 'skipped' else ''])
+        for error in errors:
+            writer.writerow([error['email'], 'invalid', f"row {error['row']}: {error['error']}"])
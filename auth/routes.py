@@ -1,7 +1,9 @@
+import click
 from flask import Blueprint, render_template, redirect, url_for, flash, request
 from flask_login import login_user, logout_user, login_required
-from werkzeug.security import check_password_hash
-from modules.models import User
+from modules.models import User, db
+from auth.login_security import login_guard
+from auth.provisioning import read_users_csv, provision_users, write_report
 
 auth = Blueprint('auth', __name__, template_folder='templates')
 
@@ -10,11 +12,44 @@ def login():
     if request.method == 'POST':
         email = request.form.get('email')
         password = request.form.get('password')
+        if not login_guard.allow(email, request.remote_addr):
+            flash('Too many login attempts. Please wait a minute and try again.', 'danger')
+            return render_template('login.html'), 429
         user = User.query.filter_by(email=email).first()
-        if user and check_password_hash(user.password, password):
+        if user and login_guard.verify(user, password):
+            db.session.commit()
+            login_guard.succeeded(email)
             login_user(user)
             flash('Logged in successfully.', 'success')
             return redirect(url_for('admin_dashboard'))
         else:
+            login_guard.failed(request.remote_addr)
             flash('Invalid email or password.', 'danger')
     return render_template('login.html')
+
+@auth.route('/logout')
+@login_required
+def logout():
+    logout_user()
+    flash('You have been logged out.', 'info')
+    return redirect(url_for('auth.login'))
+
+@auth.cli.command('provision')
+@click.argument('csv_path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--update-existing', is_flag=True, help='Replace role and password of users that already exist.')
+@click.option('--workers', type=int, default=None, help='Password hashing processes (default: CPU count).')
+@click.option('--report', 'report_path', type=click.Path(dir_okay=False), default=None, help='Write a per-user CSV report.')
+def provision(csv_path, update_existing, workers, report_path):
+    """Create users from a CSV with email,role,password columns"""
+    try:
+        rows, errors = read_users_csv(csv_path)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    report = provision_users(rows, login_guard.method, update_existing=update_existing, workers=workers)
+    for error in errors:
+        click.echo(f"row {error['row']}: {error['email'] or '-'}: {error['error']}", err=True)
+    click.echo(f"{len(report['created'])} created, {len(report['updated'])} updated, "
+               f"{len(report['skipped'])} skipped (already exist), {len(errors)} invalid")
+    if report_path:
+        write_report(report_path, report, errors)
+        click.echo(f"Report written to {report_path}")
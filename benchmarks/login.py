@@ -0,0 +1,168 @@
+"""Login throughput benchmark.
+
+Usage:
+    python -m benchmarks.login
+    python -m benchmarks.login --methods pbkdf2:sha256:600000 pbkdf2:sha256:260000 scrypt:32768:8:1
+    python -m benchmarks.login --users 200 --logins 400 --workers 8
+
+Three measurements:
+  1. hash verify rate for each --methods entry (raw check_password_hash cost),
+  2. a shift-start storm: --workers processes each logging in distinct users
+     through POST /auth/login against the configured hash method, all from
+     one office IP as they arrive behind the proxy,
+  3. a brute-force flood of bad passwords for one email from one IP, showing
+     how many attempts are rejected by the rate limiter before any hashing.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from datetime import datetime
+from werkzeug.security import generate_password_hash, check_password_hash
+
+from benchmarks.run import DEFAULT_RESULTS_DIR, load_app, percentile
+
+DEFAULT_DB_PATH = '/tmp/lra_bench/login.db'
+DEFAULT_METHODS = ['pbkdf2:sha256:600000', 'pbkdf2:sha256:260000', 'scrypt:32768:8:1']
+PASSWORD = 'shift-start-password'
+
+def user_email(index):
+    return f'officer{index:05d}@lra.gov.lr'
+
+def measure_hash_methods(methods, iterations):
+    results = {}
+    for method in methods:
+        stored = generate_password_hash(PASSWORD, method=method)
+        start = time.perf_counter()
+        for _ in range(iterations):
+            check_password_hash(stored, PASSWORD)
+        elapsed = time.perf_counter() - start
+        results[method] = {
+            'verify_ms': round(elapsed / iterations * 1000, 3),
+            'verifies_per_second': round(iterations / elapsed, 1)
+        }
+        print(f"  {method:<28} {results[method]['verify_ms']} ms/verify")
+    return results
+
+def seed_users(app, count):
+    from modules.models import User, db
+    from auth.login_security import login_guard
+    stored = login_guard.hash_password(PASSWORD)
+    with app.app_context():
+        User.query.filter(User.email.like('officer%@lra.gov.lr')).delete(synchronize_session=False)
+        db.session.execute(User.__table__.insert(), [
+            {'email': user_email(i), 'password': stored, 'role': 'user'} for i in range(count)
+        ])
+        db.session.commit()
+
+# Address every storm login comes from, as an office behind one NAT would
+OFFICE_IP = '10.0.0.1'
+
+# Per-worker app, set by _worker_init in each login storm process
+_worker = {}
+
+def _worker_init(db_path):
+    _worker['app'] = load_app(db_path)
+
+def _worker_login(indexes):
+    app = _worker['app']
+    latencies = []
+    status_codes = {}
+    for index in indexes:
+        client = app.test_client()
+        start = time.perf_counter()
+        response = client.post('/auth/login', data={'email': user_email(index), 'password': PASSWORD},
+                               environ_base={'REMOTE_ADDR': OFFICE_IP})
+        latencies.append(time.perf_counter() - start)
+        status_codes[response.status_code] = status_codes.get(response.status_code, 0) + 1
+    return latencies, status_codes
+
+def login_storm(db_path, users, logins, workers):
+    indexes = [i % users for i in range(logins)]
+    shards = [indexes[w::workers] for w in range(workers)]
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(workers, initializer=_worker_init, initargs=(db_path,)) as pool:
+        start = time.perf_counter()
+        outcomes = pool.map(_worker_login, shards)
+        wall = time.perf_counter() - start
+    latencies = sorted(l for worker_latencies, _ in outcomes for l in worker_latencies)
+    status_codes = {}
+    for _, codes in outcomes:
+        for code, count in codes.items():
+            status_codes[str(code)] = status_codes.get(str(code), 0) + count
+    result = {
+        'logins': len(latencies),
+        'logins_per_second': round(len(latencies) / wall, 1),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'status_codes': status_codes
+    }
+    print(f"  {result['logins_per_second']} logins/s, p95={result['p95_ms']}ms, status={status_codes}")
+    return result
+
+def brute_force_flood(app, attempts):
+    client = app.test_client()
+    rejected = 0
+    start = time.perf_counter()
+    for _ in range(attempts):
+        response = client.post('/auth/login', data={'email': user_email(0), 'password': 'wrong'},
+                               environ_base={'REMOTE_ADDR': '192.0.2.1'})
+        if response.status_code == 429:
+            rejected += 1
+    elapsed = time.perf_counter() - start
+    result = {
+        'attempts': attempts,
+        'rejected_before_hashing': rejected,
+        'attempts_per_second': round(attempts / elapsed, 1)
+    }
+    print(f"  {rejected}/{attempts} rejected, {result['attempts_per_second']} attempts/s")
+    return result
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help='Benchmark SQLite database path.')
+    parser.add_argument('--methods', nargs='*', default=DEFAULT_METHODS, help='Hash methods to compare.')
+    parser.add_argument('--hash-iterations', type=int, default=20, help='Verifies timed per method.')
+    parser.add_argument('--users', type=int, default=100, help='Distinct users in the login storm.')
+    parser.add_argument('--logins', type=int, default=200, help='Total logins in the login storm.')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help='Login storm processes.')
+    parser.add_argument('--flood', type=int, default=500, help='Bad-password attempts in the flood.')
+    parser.add_argument('--output', default=None, help='Results file (default: benchmarks/results/login_<timestamp>.json).')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    os.makedirs(os.path.dirname(args.db), exist_ok=True)
+    app = load_app(args.db)
+
+    print('Hash verify cost:')
+    hash_methods = measure_hash_methods(args.methods, args.hash_iterations)
+    method = app.config['PASSWORD_HASH_METHOD'] or 'the Werkzeug default'
+    print(f"Login storm with {method} ({args.logins} logins, {args.workers} workers):")
+    seed_users(app, args.users)
+    storm = login_storm(args.db, args.users, args.logins, args.workers)
+    print('Brute-force flood:')
+    flood = brute_force_flood(app, args.flood)
+
+    results = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'password_hash_method': app.config['PASSWORD_HASH_METHOD'],
+            'workers': args.workers
+        },
+        'hash_methods': hash_methods,
+        'login_storm': storm,
+        'brute_force_flood': flood
+    }
+    output = args.output or os.path.join(DEFAULT_RESULTS_DIR, f"login_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    print(f"Results written to {output}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
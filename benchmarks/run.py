@@ -0,0 +1,332 @@
+"""Latency and load benchmarks for every registered route.
+
+Usage:
+    python -m benchmarks.run                          # full volumes, all routes
+    python -m benchmarks.run --scale 0.01 --requests 50 --workers 4
+    python -m benchmarks.run --routes risk. compliance.
+    python -m benchmarks.run --compare benchmarks/results/baseline.json
+
+Each route is driven twice: sequentially through one in-process Flask test
+client, and concurrently from a pool of worker processes that each load
+their own app instance. Routes run against a fresh copy of the seeded
+database, so rows inserted by the POST routes never carry over into the
+next run. Results are written as JSON so two runs can be
+compared with --compare, which exits non-zero when a route's p95 latency
+regresses by more than --threshold.
+"""
+import argparse
+import json
+import logging
+import math
+import multiprocessing
+import os
+import platform
+import resource
+import sqlite3
+import subprocess
+import sys
+import time
+from contextlib import closing
+from datetime import datetime
+
+from benchmarks.seed import (
+    BENCH_USER_EMAIL, COMPANIES, DEFAULT_VOLUMES, seed_database, seed_memory_stores, seed_profiles, seeded_volumes
+)
+
+DEFAULT_DB_PATH = '/tmp/lra_bench/lra_app.db'
+DEFAULT_RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+# URL arguments for routes that take them
+ROUTE_ARGS = {
+    'tax_audit.view_tax_return': {'return_id': 'TR001'},
+    'transfer_pricing.view_tp_analysis': {'analysis_id': 'TP001'},
+    'risk.view_risk': {'risk_id': 'RISK001'},
+    'company_profile.view_profile': {'company': COMPANIES[0]}
+}
+
+# Query strings for GET routes that need them
+ROUTE_QUERY = {
+    'international_tax.tax_calculation': {'country': 'DE', 'amount': '1000'}
+}
+
+# Request bodies for POST routes worth benchmarking
+POST_ROUTES = {
+    'calculate_gst': {'data': {
+        'company_name': COMPANIES[0], 'transaction_type': 'exclusive',
+        'resource_type': 'mining', 'item_category': '', 'amount': '1000', 'notes': ''
+    }},
+    'bulk_gst_calculate': {'json': {'transactions': [
+        {'resource_type': 'mining', 'transaction_type': 'inclusive', 'amount': 1000 + i}
+        for i in range(500)
+    ]}},
+    'international_tax.tax_calculation_batch': {'json': {'rows': [
+        {'country': ['DE', 'uk', 'LR', 'us'][i % 4], 'amount': 100 + i} for i in range(5000)
+    ]}},
+    'calculate_tax_post': {'data': {'country': 'LR', 'amount': '1000'}}
+}
+
+# Routes that change session state or are not meaningful to time. The
+# exports write a full-table CSV into exports/ on every request.
+SKIP_ENDPOINTS = {
+    'static', 'auth.logout', 'auth.login', 'export_gst_calculations_csv', 'export_compliance_csv'
+}
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def summarize(latencies, status_codes, wall_seconds):
+    ordered = sorted(latencies)
+    errors = sum(count for code, count in status_codes.items() if int(code) >= 500)
+    return {
+        'requests': len(ordered),
+        'p50_ms': round(percentile(ordered, 50) * 1000, 3) if ordered else None,
+        'p95_ms': round(percentile(ordered, 95) * 1000, 3) if ordered else None,
+        'p99_ms': round(percentile(ordered, 99) * 1000, 3) if ordered else None,
+        'mean_ms': round(sum(ordered) / len(ordered) * 1000, 3) if ordered else None,
+        'throughput_rps': round(len(ordered) / wall_seconds, 2) if wall_seconds else None,
+        'errors': errors,
+        'status_codes': {str(code): count for code, count in sorted(status_codes.items())}
+    }
+
+def warn_on_errors(name, stats):
+    """Print a warning for a route that answered with server errors"""
+    if stats['errors']:
+        print(f"  WARNING: {name} returned {stats['errors']} server errors {stats['status_codes']}")
+
+def peak_rss_mb():
+    """Peak resident set size of this process and its reaped children"""
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return {'self': round(own / divisor, 1), 'children': round(children / divisor, 1)}
+
+def working_copy_path(db_path):
+    """The database the routes run against, next to the seeded one"""
+    base, ext = os.path.splitext(db_path)
+    return f'{base}_run{ext or ".db"}'
+
+def copy_database(source, target):
+    """Replace target with a consistent copy of source"""
+    for path in (target, f'{target}-journal'):
+        if os.path.exists(path):
+            os.remove(path)
+    with closing(sqlite3.connect(source)) as src, closing(sqlite3.connect(target)) as dst:
+        src.backup(dst)
+
+def load_app(db_path):
+    """Import the application against the benchmark database"""
+    os.environ['DATABASE_PATH'] = db_path
+    import app as app_module
+    # Server errors are counted per route; their tracebacks would drown the report
+    app_module.app.logger.setLevel(logging.CRITICAL)
+    return app_module.app
+
+def discover_routes(app):
+    """Build (name, method, url, request kwargs) for every benchmarkable route"""
+    from flask import url_for
+    targets = []
+    with app.test_request_context():
+        for rule in sorted(app.url_map.iter_rules(), key=lambda r: r.endpoint):
+            endpoint = rule.endpoint
+            if endpoint in SKIP_ENDPOINTS:
+                continue
+            if not set(rule.arguments) <= set(ROUTE_ARGS.get(endpoint, {})):
+                continue
+            url = url_for(endpoint, **ROUTE_ARGS.get(endpoint, {}), **ROUTE_QUERY.get(endpoint, {}))
+            if endpoint in POST_ROUTES and 'POST' in rule.methods:
+                targets.append((f'POST {endpoint}', 'POST', url, POST_ROUTES[endpoint]))
+            elif 'GET' in rule.methods:
+                targets.append((f'GET {endpoint}', 'GET', url, {}))
+    return targets
+
+def logged_in_client(app):
+    from modules.models import User
+    client = app.test_client()
+    with app.app_context():
+        user_id = User.query.filter_by(email=BENCH_USER_EMAIL).first().id
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+    return client
+
+def time_requests(client, method, url, kwargs, count):
+    latencies = []
+    status_codes = {}
+    for _ in range(count):
+        start = time.perf_counter()
+        response = client.open(url, method=method, **kwargs)
+        response.get_data()
+        latencies.append(time.perf_counter() - start)
+        status_codes[response.status_code] = status_codes.get(response.status_code, 0) + 1
+    return latencies, status_codes
+
+# Per-worker state, populated by _worker_init in each load-generator process
+_worker = {}
+
+def _worker_init(db_path, volumes):
+    app = load_app(db_path)
+    seed_memory_stores(volumes)
+    _worker['app'] = app
+    _worker['client'] = logged_in_client(app)
+
+def _worker_run(task):
+    method, url, kwargs, count = task
+    return time_requests(_worker['client'], method, url, kwargs, count)
+
+def run_in_process(client, targets, requests, warmup):
+    results = {}
+    for name, method, url, kwargs in targets:
+        time_requests(client, method, url, kwargs, warmup)
+        start = time.perf_counter()
+        latencies, status_codes = time_requests(client, method, url, kwargs, requests)
+        results[name] = summarize(latencies, status_codes, time.perf_counter() - start)
+        print(f"  {name:<55} p50={results[name]['p50_ms']}ms p95={results[name]['p95_ms']}ms")
+        warn_on_errors(name, results[name])
+    return results
+
+def run_load(pool, workers, targets, requests, warmup):
+    results = {}
+    per_worker = max(1, requests // workers)
+    for name, method, url, kwargs in targets:
+        pool.map(_worker_run, [(method, url, kwargs, warmup)] * workers)
+        start = time.perf_counter()
+        outcomes = pool.map(_worker_run, [(method, url, kwargs, per_worker)] * workers)
+        wall = time.perf_counter() - start
+        latencies = []
+        status_codes = {}
+        for worker_latencies, worker_codes in outcomes:
+            latencies.extend(worker_latencies)
+            for code, count in worker_codes.items():
+                status_codes[code] = status_codes.get(code, 0) + count
+        results[name] = summarize(latencies, status_codes, wall)
+        print(f"  {name:<55} {results[name]['throughput_rps']} req/s p99={results[name]['p99_ms']}ms")
+        warn_on_errors(name, results[name])
+    return results
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(current, baseline_path, threshold):
+    """Print p95 changes against a baseline; return the regressed route names.
+
+    A route whose error count or status code mix changed counts as a
+    regression whatever its latency, so a route that starts failing fast
+    is not mistaken for a speed-up.
+    """
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = []
+    for mode in ('in_process', 'load'):
+        for name, stats in current['routes'].get(mode, {}).items():
+            before = baseline['routes'].get(mode, {}).get(name)
+            if not before:
+                continue
+            if stats.get('errors') != before.get('errors') or stats.get('status_codes') != before.get('status_codes'):
+                print(f"  [{mode}] {name:<55} status {before.get('status_codes')} -> {stats.get('status_codes')} STATUS CHANGED")
+                regressions.append(f'{mode}:{name}')
+                continue
+            if not before.get('p95_ms') or stats.get('p95_ms') is None:
+                continue
+            change = (stats['p95_ms'] - before['p95_ms']) / before['p95_ms']
+            marker = 'REGRESSION' if change > threshold else ''
+            print(f"  [{mode}] {name:<55} p95 {before['p95_ms']} -> {stats['p95_ms']} ms ({change:+.1%}) {marker}")
+            if change > threshold:
+                regressions.append(f'{mode}:{name}')
+    return regressions
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help='Benchmark SQLite database path.')
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiplier applied to the default volumes.')
+    parser.add_argument('--reseed', action='store_true', help='Reseed even if the database matches the volumes.')
+    parser.add_argument('--requests', type=int, default=200, help='Timed requests per route and mode.')
+    parser.add_argument('--warmup', type=int, default=5, help='Untimed requests per route before timing.')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help='Load generator processes.')
+    parser.add_argument('--routes', nargs='*', default=None, help='Only run routes whose name contains one of these.')
+    parser.add_argument('--skip-load', action='store_true', help='Only run the in-process pass.')
+    parser.add_argument('--output', default=None, help='Results file (default: benchmarks/results/<timestamp>.json).')
+    parser.add_argument('--compare', default=None, help='Baseline results file to compare against.')
+    parser.add_argument('--threshold', type=float, default=0.10, help='Allowed p95 regression before failing.')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    volumes = {name: max(1, int(count * args.scale)) for name, count in DEFAULT_VOLUMES.items()}
+    os.makedirs(os.path.dirname(args.db), exist_ok=True)
+
+    # args.db is only ever seeded; the run mutates a copy of it
+    run_db = working_copy_path(args.db)
+    reseed = args.reseed or not os.path.exists(args.db) or seeded_volumes(args.db) != volumes
+    if not reseed:
+        copy_database(args.db, run_db)
+    elif os.path.exists(run_db):
+        os.remove(run_db)
+
+    # Loading the app creates the tables seed_database fills
+    app = load_app(run_db)
+    if reseed:
+        print(f"Seeding {args.db} with {volumes}")
+        start = time.perf_counter()
+        seed_database(run_db, volumes)
+        copy_database(run_db, args.db)
+        print(f"Seeded in {time.perf_counter() - start:.1f}s")
+    seed_memory_stores(volumes)
+    with app.app_context():
+        seed_profiles()
+
+    targets = discover_routes(app)
+    if args.routes:
+        targets = [t for t in targets if any(pattern in t[0] for pattern in args.routes)]
+
+    print(f"In-process: {len(targets)} routes x {args.requests} requests")
+    in_process = run_in_process(logged_in_client(app), targets, args.requests, args.warmup)
+
+    load = {}
+    if not args.skip_load:
+        print(f"Load: {len(targets)} routes x {args.requests} requests across {args.workers} workers")
+        context = multiprocessing.get_context('spawn')
+        with context.Pool(args.workers, initializer=_worker_init, initargs=(run_db, volumes)) as pool:
+            load = run_load(pool, args.workers, targets, args.requests, args.warmup)
+
+    results = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'volumes': volumes,
+            'requests': args.requests,
+            'workers': args.workers
+        },
+        'peak_rss_mb': peak_rss_mb(),
+        'routes': {'in_process': in_process, 'load': load}
+    }
+
+    output = args.output or os.path.join(DEFAULT_RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    print(f"Peak RSS: {results['peak_rss_mb']} MB")
+    failing = sorted({name for mode in (in_process, load) for name, stats in mode.items() if stats['errors']})
+    if failing:
+        print(f"WARNING: {len(failing)} routes returned server errors: {', '.join(failing)}")
+    print(f"Results written to {output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} routes regressed beyond {args.threshold:.0%} or changed status")
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""Seed a SQLite database and the in-memory module stores with benchmark volumes.
+
+Data is generated deterministically from a fixed random seed so two runs
+with the same volumes hit identical data.
+"""
+import json
+import random
+import sqlite3
+from datetime import date, datetime, timedelta
+from werkzeug.security import generate_password_hash
+
+DEFAULT_VOLUMES = {
+    'gst_calculations': 1000000,
+    'compliance': 200000,
+    'tax_returns': 50000,
+    'tp_analyses': 50000,
+    'risk_assessments': 20000
+}
+
+BENCH_USER_EMAIL = 'bench.admin@lra.gov.lr'
+BENCH_USER_PASSWORD = 'bench-password'
+
+COMPANIES = [f'Benchmark Company {i:04d}' for i in range(2000)]
+REVIEWERS = [f'reviewer{i:02d}@lra.gov.lr' for i in range(50)]
+RESOURCE_TYPES = ['standard', 'mining', 'forestry', 'petroleum', 'gold', 'iron_ore', 'rubber', 'palm_oil']
+STATUSES = ['Compliant', 'Non-Compliant', 'Pending']
+RISK_LEVELS = ['Low', 'Medium', 'High']
+
+CHUNK_SIZE = 50000
+
+def _chunks(rows, size=CHUNK_SIZE):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _gst_rows(rng, count):
+    start = datetime(2020, 1, 1)
+    for i in range(count):
+        gross = round(rng.uniform(100, 5000000), 2)
+        rate = 0.15
+        net = round(gross / (1 + rate), 2)
+        yield (
+            rng.choice(COMPANIES),
+            rng.choice(['inclusive', 'exclusive']),
+            rng.choice(RESOURCE_TYPES),
+            gross,
+            rate,
+            round(gross - net, 2),
+            net,
+            gross,
+            (start + timedelta(minutes=i * 3)).strftime('%Y-%m-%d %H:%M:%S.%f'),
+            rng.choice(REVIEWERS),
+            ''
+        )
+
+def _compliance_rows(rng, count):
+    today = date.today()
+    stamped = datetime(2025, 1, 1)
+    for i in range(count):
+        yield (
+            rng.choice(COMPANIES),
+            f'Regulation {rng.randint(1, 300)}',
+            rng.choice(STATUSES),
+            'Generated finding',
+            'Generated recommendation',
+            rng.choice(REVIEWERS),
+            (today + timedelta(days=rng.randint(-90, 365))).isoformat(),
+            (stamped + timedelta(seconds=i)).strftime('%Y-%m-%d %H:%M:%S.%f')
+        )
+
+def seeded_volumes(db_path):
+    """Return the volumes a database was seeded with, or None"""
+    with sqlite3.connect(db_path) as conn:
+        conn.execute('CREATE TABLE IF NOT EXISTS bench_meta (key TEXT PRIMARY KEY, value TEXT)')
+        row = conn.execute("SELECT value FROM bench_meta WHERE key = 'volumes'").fetchone()
+    return json.loads(row[0]) if row else None
+
+def seed_database(db_path, volumes, seed=42):
+    """Fill the tables created by create_app() with generated rows"""
+    rng = random.Random(seed)
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute('PRAGMA journal_mode = OFF')
+        conn.execute('PRAGMA synchronous = OFF')
+        for table in ('gst_calculations', 'compliance', 'company_profiles', 'users'):
+            conn.execute(f'DELETE FROM {table}')
+
+        conn.execute(
+            'INSERT INTO users (email, password, role) VALUES (?, ?, ?)',
+            (BENCH_USER_EMAIL, generate_password_hash(BENCH_USER_PASSWORD), 'admin')
+        )
+        for chunk in _chunks(_gst_rows(rng, volumes['gst_calculations'])):
+            conn.executemany(
+                'INSERT INTO gst_calculations (company_name, transaction_type, resource_type, gross_amount, '
+                'gst_rate, gst_amount, net_amount, total_amount, calculation_date, calculated_by, notes) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', chunk)
+        for chunk in _chunks(_compliance_rows(rng, volumes['compliance'])):
+            conn.executemany(
+                'INSERT INTO compliance (company, regulation, status, findings, recommendations, '
+                'checked_by, next_review_date, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)', chunk)
+
+        conn.execute('CREATE TABLE IF NOT EXISTS bench_meta (key TEXT PRIMARY KEY, value TEXT)')
+        conn.execute("INSERT OR REPLACE INTO bench_meta (key, value) VALUES ('volumes', ?)",
+                     (json.dumps(volumes, sort_keys=True),))
+        conn.commit()
+        conn.execute('ANALYZE')
+    finally:
+        conn.close()
+
+def seed_memory_stores(volumes, seed=42):
+    """Extend the in-memory tax_audit, transfer_pricing and risk stores"""
+    from modules.tax_audit import tax_returns
+    from modules.transfer_pricing import tp_analyses
+    from modules.risk import risk_assessments
+
+    rng = random.Random(seed)
+    for i in range(len(tax_returns), volumes['tax_returns']):
+        revenue = round(rng.uniform(1e5, 5e7), 2)
+        tax_returns.append({
+            'return_id': f'TR{i + 1:03d}',
+            'company': rng.choice(COMPANIES),
+            'tax_period': f'{rng.randint(2019, 2025)}-Q{rng.randint(1, 4)}',
+            'revenue_usd': revenue,
+            'revenue_lrd': revenue * 190,
+            'tax_due_usd': revenue * 0.1,
+            'tax_due_lrd': revenue * 19,
+            'filed_date': (date(2019, 1, 1) + timedelta(days=rng.randint(0, 2400))).isoformat()
+        })
+    for i in range(len(tp_analyses), volumes['tp_analyses']):
+        value = round(rng.uniform(1e5, 5e7), 2)
+        tp_analyses.append({
+            'analysis_id': f'TP{i + 1:03d}',
+            'company': rng.choice(COMPANIES),
+            'transaction_type': 'Sale of Iron Ore',
+            'related_party': 'Parent Company',
+            'transaction_value_usd': value,
+            'arm_length_price_usd': round(value * rng.uniform(0.9, 1.1), 2),
+            'adjustment_required': rng.random() < 0.3,
+            'analysis_method': 'Comparable Uncontrolled Price',
+            'analyst': rng.choice(REVIEWERS),
+            'submitted_date': (date(2019, 1, 1) + timedelta(days=rng.randint(0, 2400))).isoformat()
+        })
+    for i in range(len(risk_assessments), volumes['risk_assessments']):
+        risk_assessments.append({
+            'risk_id': f'RISK{i + 1:03d}',
+            'company': rng.choice(COMPANIES),
+            'risk_type': 'Tax Compliance Risk',
+            'risk_level': rng.choice(RISK_LEVELS),
+            'description': 'Generated risk',
+            'mitigation_plan': 'Generated plan',
+            'assessed_by': rng.choice(REVIEWERS),
+            'assessed_date': (date(2019, 1, 1) + timedelta(days=rng.randint(0, 2400))).isoformat()
+        })
+
+def seed_profiles():
+    """Rebuild company profiles from the seeded database and memory stores.
+
+    Only valid here, where this process holds the complete in-memory stores;
+    call inside an app context after seed_memory_stores.
+    """
+    from modules.models import CompanyProfile, db
+    from modules.company_profile import (
+        rebuild_compliance_counts, record_tax_return, record_tp_analysis, record_risk
+    )
+    from modules.tax_audit import tax_returns
+    from modules.transfer_pricing import tp_analyses
+    from modules.risk import risk_assessments
+
+    db.session.query(CompanyProfile).delete()
+    rebuild_compliance_counts()
+    for tax_return in tax_returns:
+        record_tax_return(tax_return)
+    for analysis in tp_analyses:
+        record_tp_analysis(analysis)
+    for risk in risk_assessments:
+        record_risk(risk)
+    db.session.commit()
@@ -1,27 +1,13 @@
-from flask import Flask
-from flask_sqlalchemy import SQLAlchemy
-from flask_login import UserMixin
-from werkzeug.security import generate_password_hash
-
-app = Flask(__name__)
-app.config['SECRET_KEY'] = 'supersecretkey'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///instance/lra_app.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-
-db = SQLAlchemy(app)
-
-class User(UserMixin, db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    email = db.Column(db.String(150), unique=True, nullable=False)
-    password = db.Column(db.String(150), nullable=False)
-    role = db.Column(db.String(20), nullable=False, default='user')
+from app import app
+from modules.models import User, db
+from auth.login_security import login_guard
 
+# For bulk onboarding use: flask --app app auth provision users.csv
 with app.app_context():
-    db.create_all()
     if not User.query.filter_by(email='admin@example.com').first():
         admin_user = User(
             email='admin@example.com',
-            password=generate_password_hash('admin123'),
+            password=login_guard.hash_password('admin123'),
             role='admin'
         )
         db.session.add(admin_user)
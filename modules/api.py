@@ -0,0 +1,276 @@
+import base64
+import hashlib
+import importlib
+import json
+from datetime import date, datetime, timezone
+from functools import wraps
+from flask import Blueprint, Response, request, jsonify
+from flask_login import current_user
+from sqlalchemy import func, inspect, text
+from access_control.permissions import has_permission
+from modules.models import Compliance, db
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Create Blueprint
+api_bp = Blueprint('api', __name__)
+
+API_VERSION = 'v1'
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+COMPLIANCE_FIELDS = (
+    'id', 'company', 'regulation', 'status', 'findings', 'recommendations',
+    'checked_by', 'next_review_date', 'updated_at'
+)
+
+# In-memory stores: entity -> (module, list name, id field, fields, permission)
+STORES = {
+    'tax_returns': ('modules.tax_audit', 'tax_returns', 'return_id', (
+        'return_id', 'company', 'tax_period', 'revenue_usd', 'revenue_lrd',
+        'tax_due_usd', 'tax_due_lrd', 'filed_date'
+    ), 'tax_audit.view'),
+    'transfer_pricing': ('modules.transfer_pricing', 'tp_analyses', 'analysis_id', (
+        'analysis_id', 'company', 'transaction_type', 'related_party', 'transaction_value_usd',
+        'arm_length_price_usd', 'adjustment_required', 'analysis_method', 'analyst', 'submitted_date'
+    ), 'transfer_pricing.view'),
+    'risk': ('modules.risk', 'risk_assessments', 'risk_id', (
+        'risk_id', 'company', 'risk_type', 'risk_level', 'description',
+        'mitigation_plan', 'assessed_by', 'assessed_date'
+    ), 'risk.view')
+}
+
+# The stores are append-only lists in this worker; each one's last change time
+STARTED_AT = datetime.utcnow()
+_store_changed = {}
+
+def mark_changed(entity):
+    """Record that an in-memory store was appended to"""
+    _store_changed[entity] = datetime.utcnow()
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+@api_bp.errorhandler(ApiError)
+def handle_api_error(e):
+    return jsonify({'success': False, 'error': e.message}), e.status
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+def dumps(payload):
+    """Compact JSON bytes; uses orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(',', ':'), ensure_ascii=False, default=_json_default).encode('utf-8')
+
+def encode_cursor(entity, key):
+    raw = json.dumps([entity, key], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(entity, token):
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        cursor_entity, key = json.loads(raw)
+    except (ValueError, TypeError):
+        raise ApiError('Invalid cursor')
+    if cursor_entity != entity:
+        raise ApiError('Cursor belongs to a different resource')
+    return key
+
+def api_permission_required(permission=None):
+    """Like permission_required, but answers with JSON 401/403 instead of redirecting"""
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if not current_user.is_authenticated:
+                raise ApiError('Authentication required', 401)
+            if permission and not has_permission(current_user, permission):
+                raise ApiError('Insufficient permissions', 403)
+            return f(*args, **kwargs)
+        if permission:
+            decorated_function.required_permission = permission
+        return decorated_function
+    return decorator
+
+def parse_fields(allowed, id_field):
+    """?fields=a,b -> selected field names in declared order; the id is always included"""
+    requested = request.args.get('fields')
+    if not requested:
+        return list(allowed)
+    names = {name.strip() for name in requested.split(',') if name.strip()}
+    unknown = names - set(allowed)
+    if unknown:
+        raise ApiError(f"Unknown fields: {', '.join(sorted(unknown))}. Available: {', '.join(allowed)}")
+    names.add(id_field)
+    return [name for name in allowed if name in names]
+
+def parse_limit():
+    try:
+        limit = int(request.args.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise ApiError('limit must be an integer')
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+def _http_time(value):
+    """Naive UTC datetime -> aware, truncated to the second as HTTP dates are"""
+    return value.replace(tzinfo=timezone.utc, microsecond=0)
+
+def conditional_response(entity, state, last_modified, build_payload, check_modified_since=True):
+    """Answer 304 when the client's copy is current, otherwise build the page.
+
+    state identifies the collection version cheaply; the ETag combines it
+    with the query string so every page and field selection has its own tag.
+    If-Modified-Since is only honoured with check_modified_since, and only
+    when the last change came before the second it names: HTTP dates drop
+    the fraction, so a change later in that same second would be missed.
+    """
+    query = '&'.join(f'{k}={v}' for k, v in sorted(request.args.items(multi=True)))
+    etag = hashlib.sha1(f'{API_VERSION}|{entity}|{state}|{query}'.encode('utf-8')).hexdigest()
+    changed_at = last_modified.replace(tzinfo=timezone.utc)
+    last_modified = _http_time(last_modified)
+
+    if request.if_none_match:
+        not_modified = request.if_none_match.contains(etag)
+    else:
+        since = request.if_modified_since
+        not_modified = check_modified_since and since is not None and changed_at < since
+
+    response = Response(status=304) if not_modified else Response(dumps(build_payload()), mimetype='application/json')
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+def _page(entity, rows, limit, cursor_key, key_of):
+    """Trim a limit + 1 fetch to one page and compute the next cursor.
+
+    next_cursor is returned on the last page too: passing it on a later
+    request returns only records added or changed since.
+    """
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if rows:
+        cursor_key = key_of(len(rows) - 1)
+    return {
+        'next_cursor': encode_cursor(entity, cursor_key) if cursor_key is not None else None,
+        'has_more': has_more
+    }, rows
+
+def list_compliance():
+    fields = parse_fields(COMPLIANCE_FIELDS, 'id')
+    limit = parse_limit()
+    token = request.args.get('cursor')
+    after = decode_cursor('compliance', token) if token else 0
+    if not isinstance(after, int) or after < 0:
+        raise ApiError('Invalid cursor')
+
+    max_seq, max_updated = db.session.query(func.max(Compliance.change_seq), func.max(Compliance.updated_at)).one()
+    last_modified = max_updated or STARTED_AT
+
+    def build_payload():
+        # Plain column tuples skip ORM object construction
+        columns = [getattr(Compliance, name) for name in fields] + [Compliance.change_seq]
+        rows = db.session.query(*columns).filter(
+            Compliance.change_seq > after
+        ).order_by(Compliance.change_seq).limit(limit + 1).all()
+        meta, rows = _page('compliance', rows, limit, after, lambda i: rows[i][-1])
+        width = len(fields)
+        meta['data'] = [dict(zip(fields, row[:width])) for row in rows]
+        return meta
+
+    # updated_at comes from the app clock and can commit out of order; only
+    # the change_seq ETag reliably tells a client its copy is current
+    return conditional_response('compliance', max_seq, last_modified, build_payload, check_modified_since=False)
+
+def list_store(entity):
+    module_name, list_name, id_field, allowed, _ = STORES[entity]
+    records = getattr(importlib.import_module(module_name), list_name)
+    fields = parse_fields(allowed, id_field)
+    limit = parse_limit()
+    token = request.args.get('cursor')
+    position = decode_cursor(entity, token) if token else 0
+    if not isinstance(position, int) or position < 0:
+        raise ApiError('Invalid cursor')
+
+    # Append-only, so the length identifies the version and positions never shift
+    count = len(records)
+    last_modified = _store_changed.get(entity, STARTED_AT)
+
+    def build_payload():
+        rows = records[position:position + limit + 1]
+        meta, rows = _page(entity, rows, limit, position, lambda i: position + i + 1)
+        if len(fields) == len(allowed):
+            meta['data'] = rows
+        else:
+            meta['data'] = [{name: record.get(name) for name in fields} for record in rows]
+        return meta
+
+    return conditional_response(entity, count, last_modified, build_payload)
+
+# Route: Compliance checks, in change order
+@api_bp.route('/compliance')
+@api_permission_required()
+def compliance_collection():
+    return list_compliance()
+
+# Route: Tax returns, in filing order
+@api_bp.route('/tax_returns')
+@api_permission_required('tax_audit.view')
+def tax_returns_collection():
+    return list_store('tax_returns')
+
+# Route: Transfer pricing analyses, in submission order
+@api_bp.route('/transfer_pricing')
+@api_permission_required('transfer_pricing.view')
+def transfer_pricing_collection():
+    return list_store('transfer_pricing')
+
+# Route: Risk assessments, in assessment order
+@api_bp.route('/risk')
+@api_permission_required('risk.view')
+def risk_collection():
+    return list_store('risk')
+
+def migrate_compliance_change_tracking(engine):
+    """Add and maintain the compliance columns the read API pages by.
+
+    updated_at is stamped on rows that lack it. change_seq is the sync
+    cursor: triggers set it to MAX(change_seq) + 1 on every insert and
+    update. SQLite runs triggers inside the writing transaction, under the
+    database write lock, so sequence numbers follow commit order and a
+    slow writer can never commit behind a cursor a client already holds.
+    App-clock timestamps cannot promise that. Safe to call on every startup.
+    """
+    columns = {c['name'] for c in inspect(engine).get_columns('compliance')}
+    now = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S.%f')
+    with engine.begin() as conn:
+        if 'updated_at' not in columns:
+            conn.execute(text('ALTER TABLE compliance ADD COLUMN updated_at DATETIME'))
+        conn.execute(text('UPDATE compliance SET updated_at = :now WHERE updated_at IS NULL'), {'now': now})
+        conn.execute(text('CREATE INDEX IF NOT EXISTS ix_compliance_updated_at ON compliance (updated_at)'))
+
+        if 'change_seq' not in columns:
+            conn.execute(text('ALTER TABLE compliance ADD COLUMN change_seq INTEGER'))
+        conn.execute(text('CREATE INDEX IF NOT EXISTS ix_compliance_change_seq ON compliance (change_seq)'))
+        # Rows written without the triggers (older databases) are numbered after all others
+        conn.execute(text(
+            'UPDATE compliance SET change_seq = id + (SELECT COALESCE(MAX(change_seq), 0) FROM compliance) '
+            'WHERE change_seq IS NULL'))
+        for event in ('INSERT', 'UPDATE'):
+            # The guard keeps the trigger's own UPDATE from firing it again
+            guard = '' if event == 'INSERT' else ' WHEN NEW.change_seq IS OLD.change_seq'
+            conn.execute(text(
+                f'CREATE TRIGGER IF NOT EXISTS compliance_change_seq_{event.lower()} '
+                f'AFTER {event} ON compliance FOR EACH ROW{guard} BEGIN '
+                'UPDATE compliance SET change_seq = (SELECT COALESCE(MAX(change_seq), 0) + 1 FROM compliance) '
+                'WHERE id = NEW.id; END'))
@@ -0,0 +1,274 @@
+import gzip
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime
+import click
+from flask import Blueprint, render_template, redirect, url_for, flash, current_app
+from flask_login import login_required, current_user
+from access_control.permissions import permission_required
+from modules.gst_archive import ARCHIVE_FILE_PATTERN
+
+# Create Blueprint
+backup_bp = Blueprint('backup', __name__, template_folder='templates')
+
+SNAPSHOT_PATTERN = re.compile(r'^lra_app_(\d{8}_\d{6})$')
+
+# Names inside a snapshot directory
+MAIN_DB_NAME = 'lra_app.db'
+ARCHIVE_SUBDIR = 'archive'
+
+# Status of the admin-triggered job in this worker process
+backup_job = {'running': False, 'started': None, 'finished': None, 'result': None, 'error': None}
+_job_lock = threading.Lock()
+
+def _stepped_backup(source, target, pages_per_step, step_sleep):
+    """Run the online backup pages_per_step pages at a time, pausing step_sleep seconds between steps.
+
+    sqlite3's own sleep argument only applies when a step hits a busy or
+    locked database, so the pause between successful steps is taken in the
+    progress callback, which runs after every step.
+    """
+    def pause(status, remaining, total):
+        if remaining:
+            time.sleep(step_sleep)
+
+    source.backup(target, pages=pages_per_step, progress=pause if step_sleep > 0 else None, sleep=step_sleep)
+
+def _copy_database(source_path, target_path, pages_per_step, step_sleep, compress):
+    """Copy one SQLite file with the online backup API, optionally gzipped.
+
+    The source is read pages_per_step pages at a time with step_sleep
+    seconds between steps, so writers only wait for one short step.
+    """
+    source = sqlite3.connect(source_path)
+    target = sqlite3.connect(target_path)
+    try:
+        _stepped_backup(source, target, pages_per_step, step_sleep)
+    finally:
+        target.close()
+        source.close()
+    if compress:
+        with open(target_path, 'rb') as raw, gzip.open(target_path + '.gz', 'wb') as packed:
+            shutil.copyfileobj(raw, packed)
+        os.remove(target_path)
+
+def _archive_files(archive_dir):
+    if not os.path.isdir(archive_dir):
+        return []
+    return sorted(name for name in os.listdir(archive_dir) if ARCHIVE_FILE_PATTERN.match(name))
+
+def snapshot(db_path, archive_dir, backup_dir, pages_per_step, step_sleep, compress=False):
+    """Snapshot the live database and every GST archive file into one directory.
+
+    The main database is copied before the archives: a concurrent
+    archive-gst run can then only leave a year's rows in both copies,
+    never in neither. The set is written under a temporary name and
+    renamed when complete. Returns the snapshot directory.
+    """
+    os.makedirs(backup_dir, exist_ok=True)
+    final_path = os.path.join(backup_dir, f"lra_app_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    temp_path = tempfile.mkdtemp(dir=backup_dir, suffix='.partial')
+    try:
+        _copy_database(db_path, os.path.join(temp_path, MAIN_DB_NAME), pages_per_step, step_sleep, compress)
+        names = _archive_files(archive_dir)
+        if names:
+            os.makedirs(os.path.join(temp_path, ARCHIVE_SUBDIR))
+        for name in names:
+            _copy_database(os.path.join(archive_dir, name), os.path.join(temp_path, ARCHIVE_SUBDIR, name),
+                           pages_per_step, step_sleep, compress)
+        os.rename(temp_path, final_path)
+    except BaseException:
+        shutil.rmtree(temp_path, ignore_errors=True)
+        raise
+    return final_path
+
+def _snapshot_files(path):
+    """(name, file path) of the main database and archives in a snapshot, compressed or not"""
+    files = []
+    for directory, prefix in ((path, ''), (os.path.join(path, ARCHIVE_SUBDIR), ARCHIVE_SUBDIR + '/')):
+        if not os.path.isdir(directory):
+            continue
+        for name in sorted(os.listdir(directory)):
+            base = name[:-3] if name.endswith('.gz') else name
+            if (prefix and ARCHIVE_FILE_PATTERN.match(base)) or (not prefix and base == MAIN_DB_NAME):
+                files.append((prefix + base, os.path.join(directory, name)))
+    return files
+
+def list_snapshots(backup_dir):
+    """Snapshots in backup_dir, newest first"""
+    if not os.path.isdir(backup_dir):
+        return []
+    snapshots = []
+    for name in os.listdir(backup_dir):
+        match = SNAPSHOT_PATTERN.match(name)
+        path = os.path.join(backup_dir, name)
+        if match and os.path.isdir(path):
+            files = _snapshot_files(path)
+            snapshots.append({
+                'name': name,
+                'path': path,
+                'created': datetime.strptime(match.group(1), '%Y%m%d_%H%M%S'),
+                'compressed': any(file_path.endswith('.gz') for _, file_path in files),
+                'archives': sum(1 for file_name, _ in files if file_name != MAIN_DB_NAME),
+                'size_mb': round(sum(os.path.getsize(file_path) for _, file_path in files) / (1024 * 1024), 2)
+            })
+    return sorted(snapshots, key=lambda s: s['created'], reverse=True)
+
+def prune_snapshots(backup_dir, keep):
+    """Delete all but the newest keep snapshots; returns the deleted names"""
+    removed = []
+    for old in list_snapshots(backup_dir)[keep:]:
+        shutil.rmtree(old['path'])
+        removed.append(old['name'])
+    return removed
+
+def restore(snapshot_path, db_path, archive_dir, pages_per_step, step_sleep):
+    """Restore a snapshot over the live database and GST archive files.
+
+    Every file is integrity-checked before anything is overwritten. Live
+    archive files that are not in the snapshot are removed, so archived
+    years are never counted twice. Open connections see the restored
+    contents on their next transaction.
+    """
+    files = dict(_snapshot_files(snapshot_path))
+    if MAIN_DB_NAME not in files:
+        raise ValueError(f'{snapshot_path} does not contain {MAIN_DB_NAME}')
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        sources = {}
+        for name, path in files.items():
+            if path.endswith('.gz'):
+                sources[name] = os.path.join(work_dir, os.path.basename(name))
+                with gzip.open(path, 'rb') as packed, open(sources[name], 'wb') as raw:
+                    shutil.copyfileobj(packed, raw)
+            else:
+                sources[name] = path
+            conn = sqlite3.connect(sources[name])
+            try:
+                result = conn.execute('PRAGMA integrity_check').fetchone()[0]
+            finally:
+                conn.close()
+            if result != 'ok':
+                raise ValueError(f'{name} failed integrity check: {result}')
+
+        targets = {MAIN_DB_NAME: db_path}
+        targets.update({
+            name: os.path.join(archive_dir, name.split('/', 1)[1]) for name in sources if name != MAIN_DB_NAME
+        })
+        if len(targets) > 1:
+            os.makedirs(archive_dir, exist_ok=True)
+        for name, target_path in targets.items():
+            source = sqlite3.connect(sources[name])
+            target = sqlite3.connect(target_path)
+            try:
+                _stepped_backup(source, target, pages_per_step, step_sleep)
+            finally:
+                target.close()
+                source.close()
+        for name in _archive_files(archive_dir):
+            if f'{ARCHIVE_SUBDIR}/{name}' not in sources:
+                os.remove(os.path.join(archive_dir, name))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def run_backup(app):
+    """Take a snapshot with the app's settings and prune old ones"""
+    config = app.config
+    path = snapshot(config['DATABASE_PATH'], config['GST_ARCHIVE_DIR'], config['BACKUP_DIR'],
+                    config['BACKUP_PAGES_PER_STEP'], config['BACKUP_STEP_SLEEP'], compress=config['BACKUP_COMPRESS'])
+    removed = prune_snapshots(config['BACKUP_DIR'], config['BACKUP_KEEP'])
+    app.logger.info(f"Database snapshot written to {path}; pruned {len(removed)} old snapshots")
+    return path, removed
+
+def _run_job(app, user):
+    app.logger.info(f"Database backup requested by {user}")
+    try:
+        path, removed = run_backup(app)
+        result, error = f"{os.path.basename(path)} (pruned {len(removed)})", None
+    except Exception as e:
+        app.logger.exception('Database backup failed')
+        result, error = None, str(e)
+    with _job_lock:
+        backup_job.update(running=False, finished=datetime.now(), result=result, error=error)
+
+def init_app(app):
+    db_dir = os.path.dirname(app.config['DATABASE_PATH'])
+    app.config.setdefault('BACKUP_DIR', os.environ.get('BACKUP_DIR', os.path.join(db_dir, 'backups')))
+    app.config.setdefault('BACKUP_KEEP', int(os.environ.get('BACKUP_KEEP', 14)))
+    app.config.setdefault('BACKUP_PAGES_PER_STEP', int(os.environ.get('BACKUP_PAGES_PER_STEP', 256)))
+    app.config.setdefault('BACKUP_STEP_SLEEP', float(os.environ.get('BACKUP_STEP_SLEEP', 0.05)))
+    app.config.setdefault('BACKUP_COMPRESS', os.environ.get('BACKUP_COMPRESS', '').lower() in ('1', 'true', 'yes'))
+
+# Route: Snapshots and job status
+@backup_bp.route('/')
+@login_required
+@permission_required('backup.manage')
+def list_backups():
+    with _job_lock:
+        job = dict(backup_job)
+    return render_template('backups.html', snapshots=list_snapshots(current_app.config['BACKUP_DIR']), job=job)
+
+# Route: Start a snapshot in the background
+@backup_bp.route('/run', methods=['POST'])
+@login_required
+@permission_required('backup.manage')
+def run_backup_job():
+    with _job_lock:
+        if backup_job['running']:
+            flash("A backup is already running.", "warning")
+            return redirect(url_for('backup.list_backups'))
+        backup_job.update(running=True, started=datetime.now(), finished=None, result=None, error=None)
+    app = current_app._get_current_object()
+    threading.Thread(target=_run_job, args=(app, current_user.email), daemon=True).start()
+    flash("Backup started.", "success")
+    return redirect(url_for('backup.list_backups'))
+
+@backup_bp.cli.command('create')
+@click.option('--compress/--no-compress', default=None, help='Gzip the snapshot (default: BACKUP_COMPRESS).')
+@click.option('--keep', type=int, default=None, help='Snapshots to retain (default: BACKUP_KEEP).')
+def create_command(compress, keep):
+    """Take an online snapshot of the live database"""
+    if compress is not None:
+        current_app.config['BACKUP_COMPRESS'] = compress
+    if keep is not None:
+        current_app.config['BACKUP_KEEP'] = keep
+    path, removed = run_backup(current_app)
+    click.echo(f"Snapshot written to {path}")
+    for name in removed:
+        click.echo(f"Pruned {name}")
+
+@backup_bp.cli.command('list')
+def list_command():
+    """List snapshots, newest first"""
+    for item in list_snapshots(current_app.config['BACKUP_DIR']):
+        click.echo(f"{item['name']}  {item['size_mb']} MB  {item['archives']} archive files")
+
+@backup_bp.cli.command('prune')
+@click.option('--keep', type=int, default=None, help='Snapshots to retain (default: BACKUP_KEEP).')
+def prune_command(keep):
+    """Delete old snapshots beyond the retention count"""
+    keep = current_app.config['BACKUP_KEEP'] if keep is None else keep
+    for name in prune_snapshots(current_app.config['BACKUP_DIR'], keep):
+        click.echo(f"Pruned {name}")
+
+@backup_bp.cli.command('restore')
+@click.argument('snapshot_path', type=click.Path(exists=True, file_okay=False))
+@click.option('--yes', is_flag=True, help='Do not ask for confirmation.')
+def restore_command(snapshot_path, yes):
+    """Replace the live database and GST archive files with a snapshot"""
+    config = current_app.config
+    if not yes:
+        click.confirm(f"Overwrite {config['DATABASE_PATH']} and the archives in {config['GST_ARCHIVE_DIR']} "
+                      f"with {snapshot_path}?", abort=True)
+    try:
+        restore(snapshot_path, config['DATABASE_PATH'], config['GST_ARCHIVE_DIR'],
+                config['BACKUP_PAGES_PER_STEP'], config['BACKUP_STEP_SLEEP'])
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"Restored {config['DATABASE_PATH']} from {snapshot_path}")
@@ -0,0 +1,142 @@
+from datetime import datetime
+import click
+from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask_login import login_required
+from sqlalchemy.dialects.sqlite import insert
+from access_control.permissions import permission_required
+from modules.models import CompanyProfile, Compliance, db
+
+# Create Blueprint
+profile_bp = Blueprint('company_profile', __name__, template_folder='templates')
+
+# Weights used to rank companies by risk
+RISK_WEIGHTS = {
+    'non_compliant': 3.0,
+    'high_risk': 5.0,
+    'open_risk': 1.0,
+    'tp_exposure_per_million': 2.0
+}
+
+def risk_score_expression():
+    """SQL expression recomputing risk_score from the stored counters"""
+    return (
+        CompanyProfile.non_compliant_count * RISK_WEIGHTS['non_compliant']
+        + CompanyProfile.high_risk_count * RISK_WEIGHTS['high_risk']
+        + CompanyProfile.open_risk_count * RISK_WEIGHTS['open_risk']
+        + CompanyProfile.tp_adjustment_exposure_usd / 1000000.0 * RISK_WEIGHTS['tp_exposure_per_million']
+    )
+
+def _status_column(status):
+    if status == 'Compliant':
+        return 'compliant_count'
+    if status == 'Non-Compliant':
+        return 'non_compliant_count'
+    return 'other_status_count'
+
+def _apply(company, **increments):
+    """Add increments to a company's counters and refresh its score.
+
+    The row is created on first use; counters are bumped in SQL so
+    concurrent writers never lose an update. Caller commits.
+    """
+    db.session.execute(
+        insert(CompanyProfile.__table__)
+        .values(company=company)
+        .on_conflict_do_nothing(index_elements=['company'])
+    )
+    values = {name: getattr(CompanyProfile, name) + amount for name, amount in increments.items()}
+    values['updated_at'] = datetime.utcnow()
+    db.session.execute(
+        CompanyProfile.__table__.update()
+        .where(CompanyProfile.company == company)
+        .values(**values)
+    )
+    db.session.execute(
+        CompanyProfile.__table__.update()
+        .where(CompanyProfile.company == company)
+        .values(risk_score=risk_score_expression())
+    )
+
+def record_compliance(company, status):
+    _apply(company, **{_status_column(status): 1})
+
+def record_compliance_rows(rows):
+    """Fold a batch of inserted compliance rows into the profiles"""
+    per_company = {}
+    for row in rows:
+        counts = per_company.setdefault(row['company'], {})
+        column = _status_column(row['status'])
+        counts[column] = counts.get(column, 0) + 1
+    for company, counts in per_company.items():
+        _apply(company, **counts)
+
+def record_tax_return(tax_return):
+    _apply(tax_return['company'])
+    profile = CompanyProfile.query.filter_by(company=tax_return['company']).first()
+    if not profile.latest_filed_date or tax_return['filed_date'] >= profile.latest_filed_date:
+        profile.latest_tax_period = tax_return['tax_period']
+        profile.latest_filed_date = tax_return['filed_date']
+        profile.latest_tax_due_usd = tax_return['tax_due_usd']
+
+def tp_exposure(analysis):
+    if not analysis.get('adjustment_required'):
+        return 0.0
+    return abs(analysis['arm_length_price_usd'] - analysis['transaction_value_usd'])
+
+def record_tp_analysis(analysis):
+    _apply(analysis['company'], tp_analysis_count=1, tp_adjustment_exposure_usd=tp_exposure(analysis))
+
+def record_risk(risk):
+    increments = {'open_risk_count': 1}
+    if risk.get('risk_level') == 'High':
+        increments['high_risk_count'] = 1
+    _apply(risk['company'], **increments)
+
+def rebuild_compliance_counts():
+    """Recompute every profile's compliance counters from the compliance table.
+
+    Tax, TP and risk fields are left alone: they are fed from the in-memory
+    stores of the web workers, which a CLI process cannot see.
+    """
+    db.session.execute(CompanyProfile.__table__.update().values(
+        compliant_count=0, non_compliant_count=0, other_status_count=0
+    ))
+    status_counts = db.session.query(
+        Compliance.company, Compliance.status, db.func.count(Compliance.id)
+    ).group_by(Compliance.company, Compliance.status).all()
+    for company, status, count in status_counts:
+        _apply(company, **{_status_column(status): count})
+    db.session.execute(CompanyProfile.__table__.update().values(risk_score=risk_score_expression()))
+    db.session.commit()
+    return CompanyProfile.query.count()
+
+def backfill_profiles():
+    """Seed the profiles from existing compliance rows when the table is still empty"""
+    if CompanyProfile.query.first() is None and Compliance.query.first() is not None:
+        return rebuild_compliance_counts()
+    return 0
+
+# Route: Highest-risk companies
+@profile_bp.route('/')
+@login_required
+@permission_required('company_profile.view')
+def ranked_profiles():
+    limit = min(request.args.get('limit', 50, type=int), 500)
+    profiles = CompanyProfile.query.order_by(CompanyProfile.risk_score.desc()).limit(limit).all()
+    return render_template('company_profiles.html', profiles=profiles)
+
+# Route: One company's profile
+@profile_bp.route('/<path:company>')
+@login_required
+@permission_required('company_profile.view', deny_endpoint='company_profile.ranked_profiles')
+def view_profile(company):
+    profile = CompanyProfile.query.filter_by(company=company).first()
+    if not profile:
+        flash("No profile recorded for this company.", "warning")
+        return redirect(url_for('company_profile.ranked_profiles'))
+    return render_template('company_profile_detail.html', profile=profile)
+
+@profile_bp.cli.command('rebuild')
+def rebuild_command():
+    """Recompute the compliance counters of all company profiles"""
+    click.echo(f"Rebuilt compliance counters of {rebuild_compliance_counts()} company profiles")
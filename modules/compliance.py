@@ -1,7 +1,14 @@
-from flask import Blueprint, render_template, redirect, url_for, flash
-from flask_login import login_required
+import json
+import click
+from datetime import date
+from flask import Blueprint, render_template, redirect, url_for, flash, request, current_app
+from flask_login import login_required, current_user
 from modules.models import Compliance, db
 from modules.forms import ComplianceForm
+from modules.compliance_import import iter_import_rows, import_compliance_rows
+from modules.review_scheduler import review_notifications, upcoming_reviews_for
+from modules.company_profile import record_compliance
+from modules.streaming import stream_page, iter_keyset
 
 compliance_bp = Blueprint('compliance', __name__, template_folder='templates')
 
@@ -20,6 +27,7 @@ def submit_compliance():
             next_review_date=form.next_review_date.data
         )
         db.session.add(new_entry)
+        record_compliance(new_entry.company, new_entry.status)
         db.session.commit()
         flash('Compliance check submitted successfully!', 'success')
         return redirect(url_for('compliance.submit_compliance'))
@@ -28,8 +36,40 @@ def submit_compliance():
 @compliance_bp.route('/')
 @login_required
 def index():
-    entries = Compliance.query.order_by(Compliance.id.desc()).all()
-    return render_template('compliance/compliance_index.html', entries=entries)
+    entries = iter_keyset(Compliance.query, Compliance.id)
+    return stream_page('compliance_index.html', entries=entries)
 
+@compliance_bp.route('/import', methods=['GET', 'POST'])
+@login_required
+def import_compliance():
+    if request.method == 'POST':
+        upload = request.files.get('file')
+        if not upload or not upload.filename:
+            flash('Please choose a CSV or XLSX file to import.', 'warning')
+            return redirect(url_for('compliance.import_compliance'))
+        try:
+            report = import_compliance_rows(iter_import_rows(upload.filename, upload.stream))
+        except ValueError as e:
+            flash(str(e), 'danger')
+            return redirect(url_for('compliance.import_compliance'))
+        flash(f"Imported {report['imported']} compliance records, {report['failed']} rows rejected.",
+              'success' if not report['failed'] else 'warning')
+        return render_template('compliance_import.html', report=report)
+    return render_template('compliance_import.html', report=None)
 
+@compliance_bp.route('/reviews')
+@login_required
+def my_reviews():
+    days = request.args.get('days', 30, type=int)
+    entries = upcoming_reviews_for(current_user.email, days=days)
+    return render_template('compliance_reviews.html', entries=entries, days=days, today=date.today())
 
+@compliance_bp.cli.command('notify-reviews')
+@click.option('--days', default=7, help='Report reviews due within this many days.')
+def notify_reviews(days):
+    """Log one batched due/overdue notification per reviewer"""
+    batches = review_notifications(within_days=days)
+    for batch in batches:
+        current_app.logger.info(f"Review notification: {json.dumps(batch)}")
+        click.echo(f"{batch['reviewer']}: {len(batch['overdue'])} overdue, {len(batch['due'])} due")
+    click.echo(f"{len(batches)} reviewer notifications generated")
@@ -0,0 +1,131 @@
+import csv
+import io
+import os
+from datetime import date, datetime
+from modules.models import Compliance, db
+from modules.company_profile import record_compliance_rows
+
+# Rows inserted per transaction
+IMPORT_CHUNK_SIZE = 500
+
+# Columns accepted from an import file, in Compliance column order
+IMPORT_FIELDS = [
+    'company',
+    'regulation',
+    'status',
+    'findings',
+    'recommendations',
+    'checked_by',
+    'next_review_date'
+]
+
+# Same required fields as ComplianceForm
+REQUIRED_FIELDS = ['company', 'regulation', 'status']
+
+DATE_FORMAT = '%Y-%m-%d'
+
+def _normalize_header(name):
+    return str(name or '').strip().lower().replace(' ', '_')
+
+def _cell_to_str(value):
+    if value is None:
+        return ''
+    if isinstance(value, (datetime, date)):
+        return value.strftime(DATE_FORMAT)
+    return str(value).strip()
+
+def iter_csv_rows(stream):
+    """Yield one dict per CSV data row from a binary stream; blank rows yield None"""
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    reader = csv.reader(text)
+    headers = [_normalize_header(h) for h in next(reader, [])]
+    for values in reader:
+        cells = [_cell_to_str(v) for v in values]
+        if not any(cells):
+            yield None
+            continue
+        yield dict(zip(headers, cells))
+
+def iter_xlsx_rows(stream):
+    """Yield one dict per row of the first worksheet of an XLSX file; blank rows yield None"""
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValueError('XLSX import requires the openpyxl package')
+
+    workbook = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        headers = [_normalize_header(h) for h in next(rows, [])]
+        for values in rows:
+            if values is None or all(v is None for v in values):
+                yield None
+                continue
+            yield dict(zip(headers, (_cell_to_str(v) for v in values)))
+    finally:
+        workbook.close()
+
+def iter_import_rows(filename, stream):
+    """Pick a row reader from the uploaded file's extension"""
+    extension = os.path.splitext(filename or '')[1].lower()
+    if extension == '.csv':
+        return iter_csv_rows(stream)
+    if extension == '.xlsx':
+        return iter_xlsx_rows(stream)
+    raise ValueError('Unsupported file type; upload a .csv or .xlsx file')
+
+def validate_row(row):
+    """Apply the ComplianceForm rules to one row.
+
+    Returns (values, errors) where values is ready for insertion.
+    """
+    errors = []
+    values = {field: row.get(field, '') for field in IMPORT_FIELDS}
+
+    for field in REQUIRED_FIELDS:
+        if not values[field]:
+            errors.append(f'{field} is required')
+
+    for field in IMPORT_FIELDS:
+        if not values[field]:
+            values[field] = None
+
+    review_date = values['next_review_date']
+    if review_date:
+        try:
+            values['next_review_date'] = datetime.strptime(review_date, DATE_FORMAT).date()
+        except ValueError:
+            errors.append('next_review_date must be in YYYY-MM-DD format')
+    return values, errors
+
+def _flush(chunk):
+    db.session.execute(Compliance.__table__.insert(), chunk)
+    record_compliance_rows(chunk)
+    db.session.commit()
+
+def import_compliance_rows(rows, chunk_size=IMPORT_CHUNK_SIZE):
+    """Validate and insert compliance rows in chunked bulk transactions.
+
+    Row numbers in the report match spreadsheet line numbers (header is 1).
+    Blank rows (None from the readers) are skipped but still counted.
+    """
+    report = {'imported': 0, 'failed': 0, 'errors': []}
+    chunk = []
+    for line_number, row in enumerate(rows, start=2):
+        if row is None:
+            continue
+        values, errors = validate_row(row)
+        if errors:
+            report['failed'] += 1
+            report['errors'].append({'row': line_number, 'errors': errors})
+            continue
+        chunk.append(values)
+        if len(chunk) >= chunk_size:
+            _flush(chunk)
+            report['imported'] += len(chunk)
+            chunk = []
+
+    if chunk:
+        _flush(chunk)
+        report['imported'] += len(chunk)
+    return report
@@ -0,0 +1,230 @@
+import heapq
+import os
+import re
+from contextlib import ExitStack
+from datetime import date, datetime
+from itertools import islice
+import click
+from flask import current_app
+from sqlalchemy import create_engine, text
+from modules.models import db
+from modules.streaming import STREAM_YIELD_PER
+
+# Closed years are moved from the hot database into one file per year
+ARCHIVE_FILE_FORMAT = 'gst_calculations_{year}.db'
+ARCHIVE_FILE_PATTERN = re.compile(r'^gst_calculations_(\d{4})\.db$')
+
+TABLE = 'gst_calculations'
+
+# Summed per source in gst_rollup, then rounded once the sources are merged
+ROLLUP_AMOUNTS = ('gross_amount', 'gst_amount', 'net_amount')
+
+def archive_dir():
+    return current_app.config['GST_ARCHIVE_DIR']
+
+def archive_path(year):
+    return os.path.join(archive_dir(), ARCHIVE_FILE_FORMAT.format(year=year))
+
+def archived_years():
+    """Years that have an archive file, oldest first"""
+    directory = archive_dir()
+    if not os.path.isdir(directory):
+        return []
+    years = []
+    for name in os.listdir(directory):
+        match = ARCHIVE_FILE_PATTERN.match(name)
+        if match:
+            years.append(int(match.group(1)))
+    return sorted(years)
+
+def years_needed(start=None, end=None):
+    """Archived years overlapping the inclusive [start, end] date range"""
+    return [
+        year for year in archived_years()
+        if (start is None or start < date(year + 1, 1, 1)) and (end is None or end >= date(year, 1, 1))
+    ]
+
+def parse_date_range(start, end):
+    """Parse optional YYYY-MM-DD strings; raises ValueError on bad input"""
+    parsed_start = datetime.strptime(start, '%Y-%m-%d').date() if start else None
+    parsed_end = datetime.strptime(end, '%Y-%m-%d').date() if end else None
+    return parsed_start, parsed_end
+
+def _range_clauses(start, end):
+    clauses = []
+    params = {}
+    if start is not None:
+        clauses.append('calculation_date >= :start')
+        params['start'] = start.isoformat()
+    if end is not None:
+        # calculation_date holds full timestamps, so compare against the next day
+        clauses.append('calculation_date < :end')
+        params['end'] = date.fromordinal(end.toordinal() + 1).isoformat()
+    return clauses, params
+
+def _where(clauses):
+    return (' WHERE ' + ' AND '.join(clauses)) if clauses else ''
+
+def _iter_source(connect, start, end, newest_first, batch_size):
+    """One source's calculations in a date range, in (calculation_date, id) order.
+
+    Rows are fetched batch_size at a time by keyset, each batch on a fresh
+    connection and read to the end, so no read lock is held while the
+    caller streams the rows to a client. NULL dates come first ascending
+    and last descending, as SQLite orders them.
+    """
+    columns = ', '.join(c.name for c in db.metadata.tables[TABLE].columns)
+    range_clauses, params = _range_clauses(start, end)
+    direction, after = ('DESC', '<') if newest_first else ('ASC', '>')
+    phases = [('calculation_date IS NULL', 'id', ('id',)),
+              ('calculation_date IS NOT NULL', '(calculation_date, id)', ('calculation_date', 'id'))]
+    if newest_first:
+        phases.reverse()
+    for condition, key, key_fields in phases:
+        last = None
+        while True:
+            clauses = range_clauses + [condition]
+            batch_params = dict(params)
+            if last is not None:
+                clauses.append(f"{key} {after} ({', '.join(f':last_{name}' for name in key_fields)})")
+                batch_params.update({f'last_{name}': getattr(last, name) for name in key_fields})
+            sql = (f'SELECT {columns} FROM {TABLE}{_where(clauses)} '
+                   f'ORDER BY calculation_date {direction}, id {direction} LIMIT {batch_size}')
+            with connect() as conn:
+                batch = conn.execute(text(sql), batch_params).all()
+            yield from batch
+            if len(batch) < batch_size:
+                break
+            last = batch[-1]
+
+def _open_sources(stack, years):
+    """Connection factories for the hot database and each archive year.
+
+    Archives get their own engines, disposed with the stack, rather than
+    being ATTACHed to the hot connection: SQLite allows only 10 attached
+    databases per connection.
+    """
+    sources = [db.engine.connect]
+    for year in years:
+        engine = create_engine(f'sqlite:///{archive_path(year)}')
+        stack.callback(engine.dispose)
+        sources.append(engine.connect)
+    return sources
+
+def iter_calculations(start=None, end=None, newest_first=True, limit=None, include_archives=True):
+    """Yield the column names, then GST calculation rows in a date range.
+
+    Archive files are opened only for years the range overlaps, so a range
+    inside open periods reads the hot table alone. Each source is read in
+    date order and the streams are merged, so rows are never materialised.
+    """
+    years = years_needed(start, end) if include_archives else []
+    batch_size = min(STREAM_YIELD_PER, limit) if limit else STREAM_YIELD_PER
+    with ExitStack() as stack:
+        yield [c.name for c in db.metadata.tables[TABLE].columns]
+        streams = [_iter_source(connect, start, end, newest_first, batch_size)
+                   for connect in _open_sources(stack, years)]
+        rows = heapq.merge(*streams, key=lambda row: (row.calculation_date or '', row.id), reverse=newest_first)
+        yield from islice(rows, limit or None)
+
+def select_calculations(start=None, end=None, newest_first=True, limit=None):
+    rows = iter_calculations(start, end, newest_first, limit)
+    next(rows)
+    return list(rows)
+
+def gst_rollup(start=None, end=None):
+    """Monthly totals per resource type across hot and archived data"""
+    years = years_needed(start, end)
+    clauses, params = _range_clauses(start, end)
+    sql = text(
+        "SELECT substr(calculation_date, 1, 7) AS period, resource_type, COUNT(*) AS transactions, "
+        "SUM(gross_amount) AS gross_amount, SUM(gst_amount) AS gst_amount, SUM(net_amount) AS net_amount "
+        f"FROM {TABLE}{_where(clauses)} GROUP BY period, resource_type"
+    )
+    totals = {}
+    with ExitStack() as stack:
+        for connect in _open_sources(stack, years):
+            with connect() as conn:
+                rows = conn.execute(sql, params).all()
+            for row in rows:
+                total = totals.setdefault((row.period, row.resource_type), dict(
+                    period=row.period, resource_type=row.resource_type, transactions=0,
+                    **{name: 0.0 for name in ROLLUP_AMOUNTS}
+                ))
+                total['transactions'] += row.transactions
+                for name in ROLLUP_AMOUNTS:
+                    total[name] += getattr(row, name) or 0.0
+    rollup = []
+    for key in sorted(totals, key=lambda k: (k[0] or '', k[1] or '')):
+        total = totals[key]
+        rollup.append({**total, **{name: round(total[name], 2) for name in ROLLUP_AMOUNTS}})
+    return rollup
+
+def archive_year(year):
+    """Move one calendar year of calculations into its archive file.
+
+    The copy and the delete run in a single transaction spanning both
+    database files, so a failure leaves every row in exactly one place.
+    Returns the number of rows moved.
+    """
+    os.makedirs(archive_dir(), exist_ok=True)
+    path = archive_path(year)
+    archive_engine = create_engine(f'sqlite:///{path}')
+    try:
+        # Creates the calculation_date index along with the table
+        db.metadata.tables[TABLE].create(archive_engine, checkfirst=True)
+    finally:
+        archive_engine.dispose()
+
+    start, end = f'{year}-01-01', f'{year + 1}-01-01'
+    with db.engine.connect() as conn:
+        conn.exec_driver_sql('ATTACH DATABASE ? AS gst_archive', (path,))
+        conn.commit()
+        try:
+            with conn.begin():
+                moved = conn.exec_driver_sql(
+                    f'INSERT INTO gst_archive.{TABLE} SELECT * FROM main.{TABLE} '
+                    'WHERE calculation_date >= ? AND calculation_date < ?', (start, end)
+                ).rowcount
+                conn.exec_driver_sql(
+                    f'DELETE FROM main.{TABLE} WHERE calculation_date >= ? AND calculation_date < ?', (start, end))
+        finally:
+            conn.exec_driver_sql('DETACH DATABASE gst_archive')
+    return moved
+
+def closed_years(before_year):
+    """Years before before_year that still have rows in the hot table"""
+    rows = db.session.execute(text(
+        f"SELECT DISTINCT substr(calculation_date, 1, 4) FROM {TABLE} "
+        "WHERE calculation_date < :cutoff ORDER BY 1"
+    ), {'cutoff': f'{before_year}-01-01'}).scalars().all()
+    db.session.commit()
+    return [int(year) for year in rows if year]
+
+def init_app(app):
+    app.config.setdefault('GST_ARCHIVE_DIR', os.environ.get(
+        'GST_ARCHIVE_DIR', os.path.join(os.path.dirname(app.config['DATABASE_PATH']), 'archive')
+    ))
+
+    with app.app_context():
+        db.session.execute(text(
+            f'CREATE INDEX IF NOT EXISTS ix_{TABLE}_calculation_date ON {TABLE} (calculation_date)'))
+        db.session.commit()
+
+    @app.cli.command('archive-gst')
+    @click.option('--before-year', type=int, default=None,
+                  help='Archive every year before this one (default: the current year).')
+    @click.option('--vacuum', is_flag=True, help='VACUUM the hot database afterwards to reclaim space.')
+    def archive_gst_command(before_year, vacuum):
+        """Move closed years of GST calculations into per-year archive files"""
+        before_year = before_year or date.today().year
+        years = closed_years(before_year)
+        if not years:
+            click.echo('Nothing to archive.')
+            return
+        for year in years:
+            click.echo(f'{year}: moved {archive_year(year)} rows to {archive_path(year)}')
+        if vacuum:
+            with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+                conn.exec_driver_sql('VACUUM')
+            click.echo('Hot database vacuumed.')
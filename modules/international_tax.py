@@ -1,3 +1,10 @@
+import math
+from flask import Blueprint, request, jsonify
+from flask_login import login_required
+
+# Create Blueprint
+intl_tax_bp = Blueprint('international_tax', __name__, template_folder='templates')
+
 # VAT rates by country
 VAT_RATES = {
     'US': 0.07,
@@ -5,16 +12,61 @@ VAT_RATES = {
     'DE': 0.19,
     'FR': 0.20,
     'IN': 0.18,
-    'CA': 0.05
+    'CA': 0.05,
+    'LR': 0.15  # Liberia VAT rate
+}
+
+# Alternate spellings that should resolve to a VAT_RATES key
+COUNTRY_ALIASES = {
+    'GB': 'UK',
+    'USA': 'US',
+    'LBR': 'LR'
 }
 
+# Rate lookup table, built once at import so batches never touch the aliases
+RATE_TABLE = dict(VAT_RATES)
+RATE_TABLE.update({alias: VAT_RATES[code] for alias, code in COUNTRY_ALIASES.items()})
+
+# Upper bound on rows accepted in one batch request
+MAX_BATCH_ROWS = 50000
+
+def normalize_country(country_code):
+    """Return the canonical country code for a user-supplied value"""
+    code = (country_code or '').strip().upper()
+    return COUNTRY_ALIASES.get(code, code)
+
 # Tax calculation function
 def calculate_tax(country_code, amount):
-    rate = VAT_RATES.get(country_code.upper(), 0)
+    rate = RATE_TABLE.get(normalize_country(country_code), 0)
     return round(amount * rate, 2)
 
-# Flask route to calculate tax
-@app.route('/calculate_tax', methods=['GET'])
+def calculate_tax_batch(rows):
+    """Calculate VAT for many (country, amount) rows in a single pass.
+
+    Each distinct country string is normalized and resolved to a rate once,
+    then every row is computed against that resolved rate.
+    """
+    resolved = {}
+    for country, _ in rows:
+        if country not in resolved:
+            code = normalize_country(country)
+            resolved[country] = (code, RATE_TABLE.get(code, 0))
+
+    results = []
+    for country, amount in rows:
+        code, rate = resolved[country]
+        tax = round(amount * rate, 2)
+        results.append({
+            'country': code,
+            'amount': amount,
+            'rate': rate,
+            'tax': tax,
+            'total': round(amount + tax, 2)
+        })
+    return results
+
+# Route: Calculate tax for one country/amount
+@intl_tax_bp.route('/calculate_tax', methods=['GET'])
 def tax_calculation():
     country = request.args.get('country')
     amount = request.args.get('amount', type=float)
@@ -22,8 +74,48 @@ def tax_calculation():
         return jsonify({'error': 'Missing country or amount'}), 400
     tax = calculate_tax(country, amount)
     return jsonify({
-        'country': country.upper(),
+        'country': normalize_country(country),
         'amount': amount,
         'tax': tax,
         'total': round(amount + tax, 2)
     })
+
+# Route: Calculate tax for a batch of rows
+@intl_tax_bp.route('/calculate_tax/batch', methods=['POST'])
+@login_required
+def tax_calculation_batch():
+    """Accepts {"rows": [{"country": "DE", "amount": 100.0}, ...]}"""
+    payload = request.get_json(silent=True) or {}
+    raw_rows = payload.get('rows')
+    if not isinstance(raw_rows, list):
+        return jsonify({'success': False, 'error': 'Missing rows'}), 400
+    if len(raw_rows) > MAX_BATCH_ROWS:
+        return jsonify({'success': False, 'error': f'At most {MAX_BATCH_ROWS} rows per batch'}), 413
+
+    rows = []
+    errors = []
+    for index, row in enumerate(raw_rows):
+        try:
+            country = row['country']
+            amount = float(row['amount'])
+        except (TypeError, KeyError, ValueError):
+            errors.append({'row': index, 'error': 'Missing or invalid country or amount'})
+            continue
+        if not isinstance(country, str) or not country.strip() or not math.isfinite(amount):
+            errors.append({'row': index, 'error': 'Missing or invalid country or amount'})
+            continue
+        if normalize_country(country) not in RATE_TABLE:
+            errors.append({'row': index, 'error': f'Unknown country {country!r}'})
+            continue
+        rows.append((country, amount))
+
+    if errors:
+        return jsonify({'success': False, 'errors': errors}), 400
+
+    results = calculate_tax_batch(rows)
+    return jsonify({
+        'success': True,
+        'count': len(results),
+        'total_tax': round(sum(r['tax'] for r in results), 2),
+        'results': results
+    })
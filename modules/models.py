@@ -1,3 +1,4 @@
+from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
 
@@ -19,5 +20,29 @@ class Compliance(db.Model):
     findings = db.Column(db.Text)
     recommendations = db.Column(db.Text)
     checked_by = db.Column(db.String(100))
-    next_review_date = db.Column(db.String(10))
+    next_review_date = db.Column(db.Date, index=True)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+    # Set by triggers from migrate_compliance_change_tracking; the read API's sync cursor
+    change_seq = db.Column(db.Integer, index=True)
 
+    __table_args__ = (
+        db.Index('ix_compliance_checked_by_next_review_date', 'checked_by', 'next_review_date'),
+    )
+
+
+class CompanyProfile(db.Model):
+    __tablename__ = 'company_profiles'
+    id = db.Column(db.Integer, primary_key=True)
+    company = db.Column(db.String(100), unique=True, nullable=False)
+    compliant_count = db.Column(db.Integer, nullable=False, default=0)
+    non_compliant_count = db.Column(db.Integer, nullable=False, default=0)
+    other_status_count = db.Column(db.Integer, nullable=False, default=0)
+    latest_tax_period = db.Column(db.String(20))
+    latest_filed_date = db.Column(db.String(10))
+    latest_tax_due_usd = db.Column(db.Float)
+    tp_analysis_count = db.Column(db.Integer, nullable=False, default=0)
+    tp_adjustment_exposure_usd = db.Column(db.Float, nullable=False, default=0.0)
+    open_risk_count = db.Column(db.Integer, nullable=False, default=0)
+    high_risk_count = db.Column(db.Integer, nullable=False, default=0)
+    risk_score = db.Column(db.Float, nullable=False, default=0.0, index=True)
+    updated_at = db.Column(db.DateTime)
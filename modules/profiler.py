@@ -0,0 +1,238 @@
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+from flask import Blueprint, render_template, request, redirect, url_for, flash, g, has_request_context, Response, before_render_template, template_rendered
+from flask_login import login_required, current_user
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from access_control.permissions import has_permission, permission_required
+
+# Create Blueprint
+profiler_bp = Blueprint('profiler', __name__, template_folder='templates')
+
+# Seconds between stack samples while a request is being profiled
+SAMPLE_INTERVAL = 0.002
+
+# Longest SQL statement text kept per query
+MAX_STATEMENT_CHARS = 500
+
+class StackSampler:
+    """Samples one thread's Python stack on a timer into collapsed-stack counts.
+
+    Keys are root-to-leaf frames joined by ';', the format read by
+    flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self.counts
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                key = ';'.join(reversed(stack))
+                self.counts[key] = self.counts.get(key, 0) + 1
+
+class ProfileStore:
+    """Keeps the most recent profiles of this worker process"""
+
+    def __init__(self, max_profiles):
+        self._profiles = deque(maxlen=max_profiles)
+        self._lock = threading.Lock()
+
+    def add(self, profile):
+        with self._lock:
+            self._profiles.appendleft(profile)
+
+    def all(self):
+        with self._lock:
+            return list(self._profiles)
+
+    def get(self, profile_id):
+        with self._lock:
+            return next((p for p in self._profiles if p['id'] == profile_id), None)
+
+    def resize(self, max_profiles):
+        with self._lock:
+            self._profiles = deque(self._profiles, maxlen=max_profiles)
+
+profile_store = ProfileStore(50)
+
+def collapsed_stacks(profile):
+    """Render a profile's samples as flamegraph collapsed-stack text"""
+    return ''.join(f"{stack} {count}\n" for stack, count in sorted(profile['stacks'].items()))
+
+def top_frames(profile, limit=25):
+    """Leaf frames ranked by sample count (self time)"""
+    totals = {}
+    for stack, count in profile['stacks'].items():
+        leaf = stack.rsplit(';', 1)[-1]
+        totals[leaf] = totals.get(leaf, 0) + count
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+def _active():
+    return has_request_context() and g.get('profile') is not None
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _active():
+        conn.info.setdefault('profile_query_start', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _active() and conn.info.get('profile_query_start'):
+        elapsed = time.perf_counter() - conn.info['profile_query_start'].pop()
+        g.profile['sql'].append({
+            'statement': statement[:MAX_STATEMENT_CHARS],
+            'ms': round(elapsed * 1000, 3),
+            'executemany': executemany
+        })
+
+def _before_render(sender, template, context, **extra):
+    if _active():
+        g.profile['template_starts'].append(time.perf_counter())
+
+def _after_render(sender, template, context, **extra):
+    if _active() and g.profile['template_starts']:
+        elapsed = time.perf_counter() - g.profile['template_starts'].pop()
+        g.profile['templates'].append({'name': template.name, 'ms': round(elapsed * 1000, 3)})
+
+def _profiling_mode(app):
+    if request.blueprint == 'profiler' or request.endpoint == 'static':
+        return None
+    if request.args.get('_profile') or request.headers.get('X-Profile'):
+        if current_user.is_authenticated and has_permission(current_user, 'profiler.view'):
+            return 'manual'
+    rate = app.config['PROFILER_SAMPLE_RATE']
+    if rate and random.random() < rate:
+        return 'sampled'
+    return None
+
+def _request_details():
+    return {
+        'method': request.method,
+        'path': request.full_path.rstrip('?'),
+        'endpoint': request.endpoint,
+        'user': current_user.email if current_user.is_authenticated else None
+    }
+
+def _store_profile(profile, status, details):
+    stacks = profile['sampler'].stop()
+    duration = time.perf_counter() - profile['start']
+    profile_store.add(dict(
+        details,
+        id=uuid.uuid4().hex[:12],
+        mode=profile['mode'],
+        timestamp=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        status=status,
+        duration_ms=round(duration * 1000, 3),
+        sql=profile['sql'],
+        sql_ms=round(sum(q['ms'] for q in profile['sql']), 3),
+        templates=profile['templates'],
+        stacks=stacks,
+        samples=sum(stacks.values())
+    ))
+
+def init_app(app):
+    """Install the request hooks and SQL/template timers on the app"""
+    app.config.setdefault('PROFILER_SAMPLE_RATE', float(os.environ.get('PROFILER_SAMPLE_RATE', 0)))
+    app.config.setdefault('PROFILER_MAX_PROFILES', int(os.environ.get('PROFILER_MAX_PROFILES', 50)))
+    profile_store.resize(app.config['PROFILER_MAX_PROFILES'])
+
+    event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_after_render, app)
+
+    @app.before_request
+    def start_profile():
+        mode = _profiling_mode(app)
+        if not mode:
+            return
+        sampler = StackSampler(threading.get_ident())
+        g.profile = {
+            'mode': mode,
+            'sql': [],
+            'templates': [],
+            'template_starts': [],
+            'sampler': sampler,
+            'start': time.perf_counter()
+        }
+        sampler.start()
+
+    @app.after_request
+    def finish_profile(response):
+        profile = g.get('profile')
+        if profile is None:
+            return response
+        details = _request_details()
+        if response.is_streamed:
+            # The body is generated after this hook, with g still holding the
+            # profile; finish once the server closes the response
+            profile['streamed'] = True
+            response.call_on_close(lambda: _store_profile(profile, response.status_code, details))
+            return response
+        g.pop('profile')
+        _store_profile(profile, response.status_code, details)
+        return response
+
+    @app.teardown_request
+    def discard_profile(exc):
+        # after_request is skipped when the view raises; never leave a sampler running
+        profile = g.get('profile')
+        if profile is not None and not profile.get('streamed'):
+            g.pop('profile')
+            profile['sampler'].stop()
+
+# Route: Recent profiles
+@profiler_bp.route('/')
+@login_required
+@permission_required('profiler.view')
+def list_profiles():
+    return render_template('profiler_list.html', profiles=profile_store.all())
+
+# Route: One profile
+@profiler_bp.route('/<profile_id>')
+@login_required
+@permission_required('profiler.view', deny_endpoint='profiler.list_profiles')
+def view_profile(profile_id):
+    profile = profile_store.get(profile_id)
+    if not profile:
+        flash("Profile not found; it may have been evicted.", "warning")
+        return redirect(url_for('profiler.list_profiles'))
+    return render_template('profiler_detail.html', profile=profile, top_frames=top_frames(profile))
+
+# Route: Download collapsed stacks for flamegraph tools
+@profiler_bp.route('/<profile_id>/flamegraph.txt')
+@login_required
+@permission_required('profiler.view', deny_endpoint='profiler.list_profiles')
+def download_flamegraph(profile_id):
+    profile = profile_store.get(profile_id)
+    if not profile:
+        flash("Profile not found; it may have been evicted.", "warning")
+        return redirect(url_for('profiler.list_profiles'))
+    return Response(
+        collapsed_stacks(profile),
+        mimetype='text/plain',
+        headers={'Content-Disposition': f'attachment; filename=profile_{profile_id}.folded'}
+    )
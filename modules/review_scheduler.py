@@ -0,0 +1,139 @@
+import logging
+import re
+from datetime import date, datetime, timedelta
+from sqlalchemy import inspect, text
+from modules.models import Compliance, db
+
+# Formats accepted when migrating legacy string review dates
+LEGACY_DATE_FORMATS = ['%Y-%m-%d', '%Y/%m/%d', '%d/%m/%Y', '%m/%d/%Y', '%d-%m-%Y']
+
+# Default look-ahead for a reviewer's upcoming reviews
+UPCOMING_REVIEW_DAYS = 30
+
+# Day-first or month-first legacy dates; which one was meant is unclear when both parts are <= 12
+NUMERIC_DATE_PATTERN = re.compile(r'^(\d{1,2})[/-](\d{1,2})[/-]\d{4}$')
+
+# Unparseable and ambiguous legacy review dates are kept here by migrate_next_review_date
+LEGACY_REVIEW_DATES_TABLE = 'compliance_legacy_review_dates'
+
+# Reviews due within this many days are reported as "due"
+DUE_SOON_DAYS = 7
+
+def _parse_legacy_date(value):
+    if value is None or value == '':
+        return None
+    for fmt in LEGACY_DATE_FORMATS:
+        try:
+            return datetime.strptime(str(value).strip()[:10], fmt).date()
+        except ValueError:
+            continue
+    return None
+
+def _is_ambiguous_date(value):
+    """True for values like 05/01/2025 that read as a valid date both day-first and month-first"""
+    match = NUMERIC_DATE_PATTERN.match(str(value).strip()[:10])
+    if not match:
+        return False
+    first, second = int(match.group(1)), int(match.group(2))
+    return first != second and first <= 12 and second <= 12
+
+def migrate_next_review_date(engine):
+    """Convert compliance.next_review_date from VARCHAR(10) to an indexed DATE.
+
+    SQLite cannot change a column type in place, so the table is renamed,
+    recreated from the current model (which also creates the indexes) and
+    refilled with the legacy values parsed into dates. Values that cannot
+    be parsed are stored as NULL. Ambiguous day/month values are stored
+    day-first. The original strings of both are kept in
+    LEGACY_REVIEW_DATES_TABLE so they can be checked and corrected by hand.
+    Safe to call on every startup.
+    """
+    columns = {c['name']: c for c in inspect(engine).get_columns('compliance')}
+    column = columns.get('next_review_date')
+    if column is None or 'CHAR' not in str(column['type']).upper():
+        return False
+
+    # Columns added to the model later are left to their own migrations
+    field_names = [c.name for c in Compliance.__table__.columns if c.name in columns]
+    with engine.begin() as conn:
+        conn.execute(text('ALTER TABLE compliance RENAME TO compliance_legacy'))
+        # Index names travel with the renamed table; drop them so they can be recreated
+        for index in inspect(conn).get_indexes('compliance_legacy'):
+            conn.execute(text(f'DROP INDEX IF EXISTS "{index["name"]}"'))
+        Compliance.__table__.create(conn)
+
+        rows = [dict(r._mapping) for r in conn.execute(
+            text(f"SELECT {', '.join(field_names)} FROM compliance_legacy"))]
+        kept = []
+        for row in rows:
+            raw = row['next_review_date']
+            row['next_review_date'] = _parse_legacy_date(raw)
+            if not raw:
+                continue
+            if row['next_review_date'] is None:
+                reason = 'unparseable'
+            elif _is_ambiguous_date(raw):
+                reason = 'ambiguous'
+            else:
+                continue
+            kept.append({'compliance_id': row['id'], 'raw_value': str(raw), 'reason': reason})
+            logging.warning(f"Compliance {row['id']}: {reason} next_review_date {raw!r} "
+                            f"(stored as {row['next_review_date']}) kept in {LEGACY_REVIEW_DATES_TABLE}")
+        if rows:
+            conn.execute(Compliance.__table__.insert(), rows)
+        if kept:
+            conn.execute(text(
+                f'CREATE TABLE IF NOT EXISTS {LEGACY_REVIEW_DATES_TABLE} '
+                '(compliance_id INTEGER PRIMARY KEY, raw_value VARCHAR(100) NOT NULL, reason VARCHAR(20) NOT NULL)'))
+            conn.execute(text(
+                f'INSERT OR REPLACE INTO {LEGACY_REVIEW_DATES_TABLE} (compliance_id, raw_value, reason) '
+                'VALUES (:compliance_id, :raw_value, :reason)'), kept)
+        conn.execute(text('DROP TABLE compliance_legacy'))
+    logging.info(f"Migrated {len(rows)} compliance rows to DATE next_review_date")
+    return True
+
+def due_reviews(within_days=DUE_SOON_DAYS, today=None):
+    """Reviews due on or before today + within_days, including overdue, soonest first.
+
+    Read straight from the next_review_date index on every call, so all
+    workers and the CLI see the same up-to-date list.
+    """
+    today = today or date.today()
+    return db.session.query(
+        Compliance.next_review_date,
+        Compliance.id,
+        Compliance.checked_by,
+        Compliance.company,
+        Compliance.regulation
+    ).filter(
+        Compliance.next_review_date.isnot(None),
+        Compliance.next_review_date <= today + timedelta(days=within_days)
+    ).order_by(Compliance.next_review_date, Compliance.id).all()
+
+def review_notifications(within_days=DUE_SOON_DAYS, today=None):
+    """Group due and overdue reviews into one notification per reviewer"""
+    today = today or date.today()
+    batches = {}
+    for due_date, entry_id, reviewer, company, regulation in due_reviews(within_days, today):
+        batch = batches.setdefault(reviewer or 'Unassigned', {
+            'reviewer': reviewer or 'Unassigned',
+            'overdue': [],
+            'due': []
+        })
+        item = {
+            'id': entry_id,
+            'company': company,
+            'regulation': regulation,
+            'next_review_date': due_date.isoformat()
+        }
+        batch['overdue' if due_date < today else 'due'].append(item)
+    return list(batches.values())
+
+def upcoming_reviews_for(reviewer, days=UPCOMING_REVIEW_DAYS, today=None):
+    """Reviews assigned to one reviewer up to today + days, served from the composite index"""
+    today = today or date.today()
+    return Compliance.query.filter(
+        Compliance.checked_by == reviewer,
+        Compliance.next_review_date.isnot(None),
+        Compliance.next_review_date <= today + timedelta(days=days)
+    ).order_by(Compliance.next_review_date).all()
@@ -0,0 +1,64 @@
+import os
+from flask import Response, current_app, stream_with_context, before_render_template, template_rendered
+from jinja2 import FileSystemBytecodeCache
+
+# Template output pieces joined into each chunk sent to the client
+DEFAULT_STREAM_BUFFER_SIZE = 50
+
+# Rows fetched per round trip when a list page iterates a query in batches
+STREAM_YIELD_PER = 500
+
+def iter_keyset(query, column, descending=True, batch_size=None):
+    """Yield a query's rows ordered by a unique, non-NULL column, one batch per round trip.
+
+    Each batch is read to the end before its rows are yielded. An open
+    cursor would keep SQLite's read lock, and with the rollback journal
+    every writer would wait until a slow client finished the download.
+    """
+    batch_size = batch_size or STREAM_YIELD_PER
+    last = None
+    while True:
+        batch_query = query
+        if last is not None:
+            batch_query = batch_query.filter(column < last if descending else column > last)
+        batch = batch_query.order_by(column.desc() if descending else column).limit(batch_size).all()
+        yield from batch
+        if len(batch) < batch_size:
+            return
+        last = getattr(batch[-1], column.key)
+
+def stream_page(template_name, **context):
+    """Render a template as a streamed response.
+
+    The page is sent in chunks while the template runs, so a row iterable in
+    context (such as iter_keyset(query, Model.id)) is consumed one batch at
+    a time instead of being materialised and rendered up front. The request
+    context, and with it the database session, stays open until the last
+    chunk is sent. The template signals fire around the whole stream,
+    as render_template fires them around a full render, so the profiler
+    sees streamed pages too.
+    """
+    app = current_app._get_current_object()
+    template = app.jinja_env.get_or_select_template(template_name)
+    app.update_template_context(context)
+    before_render_template.send(app, template=template, context=context)
+    stream = template.stream(context)
+    # Jinja needs at least 2 pieces per chunk; smaller settings send each piece as is
+    if app.config['STREAM_BUFFER_SIZE'] > 1:
+        stream.enable_buffering(app.config['STREAM_BUFFER_SIZE'])
+
+    def generate():
+        yield from stream
+        template_rendered.send(app, template=template, context=context)
+
+    return Response(stream_with_context(generate()), mimetype='text/html')
+
+def init_app(app):
+    app.config.setdefault('STREAM_BUFFER_SIZE', int(os.environ.get('STREAM_BUFFER_SIZE', DEFAULT_STREAM_BUFFER_SIZE)))
+    app.config.setdefault('JINJA_CACHE_DIR', os.environ.get(
+        'JINJA_CACHE_DIR', os.path.join(os.path.dirname(app.config['DATABASE_PATH']), 'jinja_cache')
+    ))
+
+    # Compiled templates are shared on disk, so new workers skip recompiling them
+    os.makedirs(app.config['JINJA_CACHE_DIR'], exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(app.config['JINJA_CACHE_DIR'])
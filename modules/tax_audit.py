@@ -2,6 +2,11 @@ from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_login import login_required, current_user
 from datetime import datetime
 import logging
+from access_control.permissions import permission_required
+from modules.models import db
+from modules.company_profile import record_tax_return
+from modules.api import mark_changed
+from modules.streaming import stream_page
 
 # Create Blueprint
 tax_audit_bp = Blueprint('tax_audit', __name__, template_folder='templates')
@@ -20,32 +25,23 @@ tax_returns = [
     }
 ]
 
-# Dummy role check
-def has_role(role):
-    return current_user.is_authenticated and getattr(current_user, 'role', None) == role
-
 # Dummy audit logger
 def log_action(user, action, details):
-    logging.info(f"{datetime.now()} - {user.username} - {action} - {details}")
+    logging.info(f"{datetime.now()} - {user.email} - {action} - {details}")
 
 # Route: View all tax returns
 @tax_audit_bp.route('/')
 @login_required
+@permission_required('tax_audit.view')
 def list_tax_returns():
-    if not has_role('TAX_AUDITOR') and not has_role('ADMIN'):
-        flash("Access denied: insufficient permissions.", "danger")
-        return redirect(url_for('auth.login'))
     log_action(current_user, 'VIEW_TAX_RETURNS', 'Viewed list of tax returns')
-    return render_template('tax_audit.html', tax_returns=tax_returns)
+    return stream_page('tax_audit.html', tax_returns=tax_returns)
 
 # Route: Submit new tax return
 @tax_audit_bp.route('/submit', methods=['GET', 'POST'])
 @login_required
+@permission_required('tax_audit.submit', deny_endpoint='tax_audit.list_tax_returns')
 def submit_tax_return():
-    if not has_role('TAX_AUDITOR'):
-        flash("Access denied: insufficient permissions.", "danger")
-        return redirect(url_for('tax_audit.list_tax_returns'))
-
     if request.method == 'POST':
         new_return = {
             'return_id': f"TR{len(tax_returns)+1:03d}",
@@ -58,6 +54,9 @@ def submit_tax_return():
             'filed_date': datetime.now().strftime('%Y-%m-%d')
         }
         tax_returns.append(new_return)
+        mark_changed('tax_returns')
+        record_tax_return(new_return)
+        db.session.commit()
         log_action(current_user, 'SUBMIT_TAX_RETURN', f"Submitted return {new_return['return_id']}")
         flash("Tax return submitted successfully.", "success")
         return redirect(url_for('tax_audit.list_tax_returns'))
@@ -67,11 +66,8 @@ def submit_tax_return():
 # Route: View tax return details
 @tax_audit_bp.route('/<return_id>')
 @login_required
+@permission_required('tax_audit.view', deny_endpoint='tax_audit.list_tax_returns')
 def view_tax_return(return_id):
-    if not has_role('TAX_AUDITOR') and not has_role('ADMIN'):
-        flash("Access denied: insufficient permissions.", "danger")
-        return redirect(url_for('tax_audit.list_tax_returns'))
-
     tax_return = next((r for r in tax_returns if r['return_id'] == return_id), None)
     if not tax_return:
         flash("Tax return not found.", "warning")
@@ -2,6 +2,11 @@ from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_login import login_required, current_user
 from datetime import datetime
 import logging
+from access_control.permissions import permission_required
+from modules.models import db
+from modules.company_profile import record_tp_analysis
+from modules.api import mark_changed
+from modules.streaming import stream_page
 
 # Create Blueprint
 tp_bp = Blueprint('transfer_pricing', __name__, template_folder='templates')
@@ -22,32 +27,23 @@ tp_analyses = [
     }
 ]
 
-# Dummy role check
-def has_role(role):
-    return current_user.is_authenticated and getattr(current_user, 'role', None) == role
-
 # Dummy audit logger
 def log_action(user, action, details):
-    logging.info(f"{datetime.now()} - {user.username} - {action} - {details}")
+    logging.info(f"{datetime.now()} - {user.email} - {action} - {details}")
 
 # Route: List all transfer pricing analyses
 @tp_bp.route('/')
 @login_required
+@permission_required('transfer_pricing.view')
 def list_tp_analyses():
-    if not has_role('TRANSFER_PRICING_SPECIALIST') and not has_role('ADMIN'):
-        flash("Access denied: insufficient permissions.", "danger")
-        return redirect(url_for('auth.login'))
     log_action(current_user, 'VIEW_TP_ANALYSES', 'Viewed list of transfer pricing analyses')
-    return render_template('tp_list.html', tp_analyses=tp_analyses)
+    return stream_page('tp_list.html', tp_analyses=tp_analyses)
 
 # Route: Submit new transfer pricing analysis
 @tp_bp.route('/submit', methods=['GET', 'POST'])
 @login_required
+@permission_required('transfer_pricing.submit', deny_endpoint='transfer_pricing.list_tp_analyses')
 def submit_tp_analysis():
-    if not has_role('TRANSFER_PRICING_SPECIALIST'):
-        flash("Access denied: insufficient permissions.", "danger")
-        return redirect(url_for('transfer_pricing.list_tp_analyses'))
-
     if request.method == 'POST':
         new_analysis = {
             'analysis_id': f"TP{len(tp_analyses)+1:03d}",
@@ -58,10 +54,13 @@ def submit_tp_analysis():
             'arm_length_price_usd': float(request.form['arm_length_price_usd']),
             'adjustment_required': request.form.get('adjustment_required') == 'True',
             'analysis_method': request.form['analysis_method'],
-            'analyst': current_user.username,
+            'analyst': current_user.email,
             'submitted_date': datetime.now().strftime('%Y-%m-%d')
         }
         tp_analyses.append(new_analysis)
+        mark_changed('transfer_pricing')
+        record_tp_analysis(new_analysis)
+        db.session.commit()
         log_action(current_user, 'SUBMIT_TP_ANALYSIS', f"Submitted analysis {new_analysis['analysis_id']}")
         flash("Transfer pricing analysis submitted successfully.", "success")
         return redirect(url_for('transfer_pricing.list_tp_analyses'))
@@ -71,11 +70,8 @@ def submit_tp_analysis():
 # Route: View transfer pricing analysis details
 @tp_bp.route('/<analysis_id>')
 @login_required
+@permission_required('transfer_pricing.view', deny_endpoint='transfer_pricing.list_tp_analyses')
 def view_tp_analysis(analysis_id):
-    if not has_role('TRANSFER_PRICING_SPECIALIST') and not has_role('ADMIN'):
-        flash("Access denied: insufficient permissions.", "danger")
-        return redirect(url_for('transfer_pricing.list_tp_analyses'))
-
     analysis = next((a for a in tp_analyses if a['analysis_id'] == analysis_id), None)
     if not analysis:
         flash("Transfer pricing analysis not found.", "warning")